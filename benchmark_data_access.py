@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark indexed data access for the Swiss Energy Scenarios system
+"""
+
+import sys
+import os
+import time
+
+# Add src to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from utils.config import config
+from data_processors.csv_processor import CSVProcessor
+
+BENCHMARK_FILES = [
+    "02-01-emissions_ghg.csv",
+    "02-02-emissions_co2.csv",
+    "04-02-final_energy_consumption_by_purpose_fuel.csv",
+]
+
+BENCHMARK_FILTERS = [
+    {"scenario": "ZERO-Basis"},
+    {"scenario": "WWB", "variant": "KKW50"},
+    {"scenario": "ZERO-A", "year_range": (2020, 2050)},
+    {"year_range": (2030, 2030)},
+]
+
+def mask_filter(df, scenario=None, variant=None, year_range=None):
+    """Reference implementation: one boolean mask per predicate."""
+    if scenario:
+        df = df[df['scenario'] == scenario]
+    if variant:
+        df = df[df['variant'] == variant]
+    if year_range:
+        start_year, end_year = year_range
+        df = df[(df['year'] >= start_year) & (df['year'] <= end_year)]
+    return df
+
+def time_per_call(func, repeat: int = 200) -> float:
+    """Return the mean latency of func in microseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def main():
+    """Compare mask-based and index-based filter latency."""
+    print("🇨🇭 Swiss Energy Scenarios Decipher - Data Access Benchmark")
+    print("=" * 80)
+
+    csv_processor = CSVProcessor(config.data_path)
+
+    for filename in BENCHMARK_FILES:
+        df = csv_processor.load_csv(filename)
+        csv_processor.filter_data(filename)  # build the index outside the timing
+        print(f"\n📊 {filename} ({len(df)} rows)")
+
+        for filters in BENCHMARK_FILTERS:
+            expected = mask_filter(df, **filters)
+            actual = csv_processor.filter_data(filename, **filters)
+            if not expected.index.equals(actual.index):
+                print(f"❌ Result mismatch for {filters}")
+                continue
+
+            mask_us = time_per_call(lambda: mask_filter(df, **filters))
+            index_us = time_per_call(lambda: csv_processor.filter_data(filename, **filters))
+            print(f"   {str(filters):55} mask {mask_us:8.1f}µs  index {index_us:8.1f}µs  "
+                  f"({mask_us / index_us:.1f}x, {len(actual)} rows)")
+
+if __name__ == "__main__":
+    main()
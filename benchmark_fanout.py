@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark parallel agent fan-out against a local stub LLM server
+"""
+
+import asyncio
+import json
+import sys
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+# Add src to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+# Simulated latency per stub agent, in seconds
+AGENT_LATENCIES = {
+    "DataInterpreter": 0.4,
+    "ScenarioAnalyst": 0.6,
+    "DocumentIntelligence": 0.8,
+    "PolicyContext": 1.0,
+}
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat completions endpoint that sleeps before answering.
+
+    The delay is taken from the model name, e.g. "stub-0.5" waits 0.5s.
+    Streaming requests are answered word by word as server-sent events.
+    """
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        model = request.get("model", "stub-0")
+
+        try:
+            time.sleep(float(model.split("-", 1)[1]))
+        except (IndexError, ValueError):
+            pass
+
+        content = f"Stub answer from {model}"
+        if request.get("stream"):
+            self._send_stream(model, content)
+            return
+
+        body = json.dumps({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        }).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, model: str, content: str):
+        """Answer a streaming request with one server-sent event per word."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if i == 0 else " " + word},
+                    "finish_reason": "stop" if i == len(words) - 1 else None
+                }]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_server() -> ThreadingHTTPServer:
+    """Start the stub server on a free local port in a background thread."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubLLMHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+async def main():
+    """Compare fan-out wall time with the slowest agent and the sum of all agents."""
+    print("🇨🇭 Swiss Energy Scenarios Decipher - Agent Fan-out Benchmark")
+    print("=" * 60)
+
+    server = start_stub_server()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    from agents.base_agent import BaseAgent, AgentResponse
+    from agents.orchestrator_agent import OrchestratorAgent
+
+    class StubAgent(BaseAgent):
+        def __init__(self, name: str, latency: float):
+            super().__init__(name=name, description=f"Stub agent ({latency}s)",
+                             openai_api_key="stub", model=f"stub-{latency}")
+
+        def _build_system_prompt(self) -> str:
+            return f"You are the {self.name} stub."
+
+        async def process_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> AgentResponse:
+            content = await self._call_openai(self._prepare_messages(query, context))
+            return AgentResponse(content=content, confidence=1.0)
+
+    orchestrator = OrchestratorAgent("stub")
+    for name, latency in AGENT_LATENCIES.items():
+        orchestrator.register_agent(StubAgent(name, latency))
+
+    routing_decision = {"primary_agents": list(AGENT_LATENCIES.keys())}
+
+    # Warm up every measured agent's client and connection with a different
+    # query, so the timing measures only the fan-out
+    await orchestrator._route_to_agents("warm-up query", routing_decision)
+
+    start = time.perf_counter()
+    responses = await orchestrator._route_to_agents("benchmark query", routing_decision)
+    wall_time = time.perf_counter() - start
+
+    slowest = max(AGENT_LATENCIES.values())
+    total = sum(AGENT_LATENCIES.values())
+    errors = [name for name, response in responses.items() if response.confidence == 0.0]
+
+    print(f"Agents:        {len(responses)} ({len(errors)} errors)")
+    print(f"Slowest agent: {slowest:.2f}s")
+    print(f"Sum of agents: {total:.2f}s")
+    print(f"Wall time:     {wall_time:.2f}s")
+
+    if errors:
+        print(f"❌ Agent errors: {', '.join(errors)}")
+    elif wall_time < (slowest + total) / 2:
+        print("✅ Fan-out runs in parallel (wall time tracks the slowest agent)")
+    else:
+        print("❌ Fan-out is serialized (wall time tracks the sum of agents)")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(main())
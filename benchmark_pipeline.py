@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Benchmark the full query pipeline offline against the fake LLM backend
+"""
+
+import argparse
+import asyncio
+import functools
+import math
+import statistics
+import sys
+import os
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add src to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+# Query corpus: (query, user language)
+DEFAULT_QUERIES = [
+    ("What are Switzerland's CO2 emissions in 2030 under the ZERO scenario?", "en"),
+    ("How does electricity consumption change by sector from 2020 to 2050?", "en"),
+    ("Show me transport energy consumption trends", "en"),
+    ("What's the difference between ZERO-Basis and WWB scenarios?", "en"),
+    ("How do scenarios differ in nuclear power assumptions?", "en"),
+    ("What methodology is used for scenario modeling?", "en"),
+    ("What do the technical reports say about winter electricity?", "en"),
+    ("What policies are needed to achieve net-zero by 2050?", "en"),
+    ("Tell me something interesting", "en"),
+    ("Wie hoch sind die CO2-Emissionen der Schweiz im Jahr 2030?", "de"),
+    ("Welche Rolle spielt die Photovoltaik im Szenario ZERO-Basis?", "de"),
+    ("Quelle est la différence entre les scénarios ZERO-Basis et WWB ?", "fr"),
+    ("Quali politiche sono necessarie per raggiungere lo zero netto entro il 2050?", "it"),
+]
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+class _CPUTimed:
+    """Awaitable that adds the main-thread CPU time spent inside a coroutine to a stage.
+
+    Only the steps the coroutine actually runs are counted, not the time it
+    is suspended while other tasks run.
+    """
+
+    def __init__(self, coroutine, stage: str, totals: Dict[str, float]):
+        self.coroutine = coroutine
+        self.stage = stage
+        self.totals = totals
+
+    def __await__(self):
+        send, error = None, None
+        while True:
+            start = time.thread_time()
+            try:
+                if error is not None:
+                    yielded = self.coroutine.throw(error)
+                else:
+                    yielded = self.coroutine.send(send)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.totals[self.stage] += time.thread_time() - start
+
+            try:
+                send, error = (yield yielded), None
+            except BaseException as e:  # Cancellation and errors thrown into the awaiting task
+                send, error = None, e
+
+def instrument(owner: Any, method: str, stage: str, totals: Dict[str, float]):
+    """Replace an instance's coroutine method with one that records its CPU time."""
+    original = getattr(owner, method)
+
+    @functools.wraps(original)
+    async def timed(*args, **kwargs):
+        return await _CPUTimed(original(*args, **kwargs), stage, totals)
+
+    setattr(owner, method, timed)
+
+def load_queries(path: Optional[str]) -> List[Tuple[str, str]]:
+    """Read "language<TAB>query" lines (or plain English queries) from a file."""
+    if not path:
+        return DEFAULT_QUERIES
+
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            language, separator, query = line.partition("\t")
+            queries.append((query, language) if separator else (line, "en"))
+    return queries
+
+async def run_benchmark(args):
+    from utils.config import config
+    from utils.llm_backend import get_fake_llm_client
+    from agents.orchestrator_agent import OrchestratorAgent
+    from agents.data_interpreter_agent import DataInterpreterAgent
+    from agents.scenario_analyst_agent import ScenarioAnalystAgent
+    from agents.document_intelligence_agent import DocumentIntelligenceAgent
+    from agents.policy_context_agent import PolicyContextAgent
+    from data_processors.data_registry import get_data_registry
+
+    class BenchmarkOrchestrator(OrchestratorAgent):
+        """Keeps the stage timings of the last query instead of only reporting them as text."""
+
+        def _with_timings(self, response, timings):
+            self.last_timings = dict(timings)
+            return super()._with_timings(response, timings)
+
+    data_registry = get_data_registry(config.data_path, config.reports_path)
+    agents = [
+        DataInterpreterAgent(config.openai_api_key, config.data_path, data_registry),
+        ScenarioAnalystAgent(config.openai_api_key, config.data_path, data_registry),
+        DocumentIntelligenceAgent(config.openai_api_key, config.reports_path, data_registry),
+        PolicyContextAgent(config.openai_api_key),
+    ]
+    orchestrator = BenchmarkOrchestrator(config.openai_api_key)
+    for agent in agents:
+        orchestrator.register_agent(agent)
+
+    cpu_totals: Dict[str, float] = defaultdict(float)
+    translator = orchestrator.translator
+    instrument(translator, "detect_language", "language_detection", cpu_totals)
+    instrument(translator, "translate_to_english", "query_translation", cpu_totals)
+    instrument(orchestrator, "_analyze_query_routing", "routing", cpu_totals)
+    for agent in agents:
+        instrument(agent, "prefetch", "prefetch", cpu_totals)
+        instrument(agent, "process_query", f"agent:{agent.name}", cpu_totals)
+    instrument(orchestrator, "_synthesize_response", "synthesis", cpu_totals)
+    instrument(translator, "translate_batch", "response_translation", cpu_totals)
+
+    queries = load_queries(args.queries)
+    fake_llm = get_fake_llm_client()
+
+    async def run_pass() -> Tuple[List[float], List[Dict[str, float]]]:
+        latencies, stage_timings = [], []
+        for query, language in queries:
+            start = time.perf_counter()
+            await orchestrator.process_query(query, {"user_type": "citizen", "language": language})
+            latencies.append(time.perf_counter() - start)
+            stage_timings.append(getattr(orchestrator, "last_timings", {}))
+        return latencies, stage_timings
+
+    for _ in range(args.warmup):
+        await run_pass()
+
+    # Measure only the timed passes
+    cpu_totals.clear()
+    fake_llm.reset_stats()
+    process_start, thread_start = time.process_time(), time.thread_time()
+
+    latencies, stage_timings = [], []
+    for _ in range(args.runs):
+        pass_latencies, pass_timings = await run_pass()
+        latencies.extend(pass_latencies)
+        stage_timings.extend(pass_timings)
+
+    process_cpu = time.process_time() - process_start
+    main_thread_cpu = time.thread_time() - thread_start
+    return latencies, stage_timings, dict(cpu_totals), process_cpu, main_thread_cpu, fake_llm.get_stats()
+
+def report(latencies, stage_timings, cpu_totals, process_cpu, main_thread_cpu, llm_stats):
+    queries = len(latencies)
+
+    print(f"\n⏱️  End-to-end latency over {queries} queries")
+    print(f"   p50: {percentile(latencies, 50):.3f}s  p95: {percentile(latencies, 95):.3f}s  "
+          f"p99: {percentile(latencies, 99):.3f}s  max: {max(latencies):.3f}s")
+
+    wall_by_stage = defaultdict(list)
+    for timings in stage_timings:
+        for stage, seconds in timings.items():
+            wall_by_stage[stage].append(seconds)
+    if wall_by_stage:
+        print("\n🧭 Wall time per stage (mean / p95)")
+        for stage, values in wall_by_stage.items():
+            print(f"   {stage:<24} {statistics.mean(values):.3f}s / {percentile(values, 95):.3f}s")
+
+    print(f"\n🤖 LLM calls: {llm_stats['total_calls']} ({llm_stats['total_calls'] / queries:.2f} per query, "
+          f"{llm_stats['latency_s']:.2f}s simulated latency each)")
+    for kind, count in sorted(llm_stats["calls"].items(), key=lambda item: -item[1]):
+        print(f"   {kind:<24} {count:>5} ({count / queries:.2f} per query)")
+
+    print("\n🧮 CPU time per stage (per query)")
+    for stage, seconds in sorted(cpu_totals.items(), key=lambda item: -item[1]):
+        print(f"   {stage:<24} {seconds / queries * 1000:8.2f} ms")
+    other = main_thread_cpu - sum(cpu_totals.values())
+    print(f"   {'orchestration (other)':<24} {other / queries * 1000:8.2f} ms")
+    print(f"   {'worker threads':<24} {(process_cpu - main_thread_cpu) / queries * 1000:8.2f} ms")
+    print(f"   {'total':<24} {process_cpu / queries * 1000:8.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the query pipeline against the fake LLM backend")
+    parser.add_argument("--queries", help='File with one query per line, optionally "language<TAB>query"')
+    parser.add_argument("--runs", type=int, default=3, help="Timed passes over the corpus (default: 3)")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed passes that warm the caches (default: 1)")
+    parser.add_argument("--latency", type=float, default=0.2,
+                        help="Simulated latency of each LLM request in seconds (default: 0.2)")
+    args = parser.parse_args()
+
+    # Configure before the config module is imported; the caches go to a
+    # scratch directory so results do not depend on earlier runs
+    scratch = tempfile.mkdtemp(prefix="benchmark_pipeline_")
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["FAKE_LLM_LATENCY"] = str(args.latency)
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    os.environ["TRANSLATION_MEMORY_PATH"] = os.path.join(scratch, "translation_memory.sqlite")
+
+    print("🇨🇭 Swiss Energy Scenarios Decipher - Pipeline Benchmark")
+    print("=" * 60)
+
+    report(*asyncio.run(run_benchmark(args)))
+
+if __name__ == "__main__":
+    main()
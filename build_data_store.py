@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Build the columnar data store for the Swiss Energy Scenarios system
+"""
+
+import sys
+import os
+import time
+
+# Add src to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from utils.config import config
+from data_processors.csv_processor import CSVProcessor
+
+def load_all(csv_processor: CSVProcessor):
+    """Load every extracted file and return (seconds, bytes in memory)."""
+    start = time.perf_counter()
+    memory = 0
+
+    for category, filenames in csv_processor.get_available_files().items():
+        for filename in filenames:
+            df = csv_processor.load_csv(filename, category)
+            memory += int(df.memory_usage(deep=True).sum())
+
+    return time.perf_counter() - start, memory
+
+def best_load(use_columnar: bool, runs: int = 3):
+    """Best of several loads by fresh processors, so both formats are compared with the files in the OS page cache."""
+    return min(load_all(CSVProcessor(config.data_path, use_columnar=use_columnar)) for _ in range(runs))
+
+def main():
+    """Build the store and compare load cost and memory against plain CSV parsing."""
+    print("🇨🇭 Swiss Energy Scenarios Decipher - Data Store Build")
+    print("=" * 60)
+
+    csv_processor = CSVProcessor(config.data_path, use_columnar=False)
+
+    print("📦 Converting CSV files to Parquet...")
+    built = csv_processor.build_columnar_store()
+    for category, filenames in built.items():
+        print(f"✅ {category}: {len(filenames)} files")
+
+    csv_seconds, csv_memory = best_load(use_columnar=False)
+    columnar_seconds, columnar_memory = best_load(use_columnar=True)
+
+    print("🧮 Building consolidated fact table...")
+    facts = csv_processor.build_fact_table()
+    print(f"✅ Fact table: {len(facts)} rows from {facts['dataset'].nunique()} files")
+
+    ratio = csv_seconds / max(columnar_seconds, 1e-9)
+    print("\n⏱️  Load of all files (best of 3):")
+    print(f"   CSV:      {csv_seconds:.2f}s, {csv_memory / 1e6:.1f} MB")
+    print(f"   Columnar: {columnar_seconds:.2f}s, {columnar_memory / 1e6:.1f} MB")
+    print(f"   Memory: {csv_memory / max(columnar_memory, 1):.1f}x smaller, load time: "
+          + (f"{ratio:.1f}x faster" if ratio >= 1 else f"{1 / ratio:.1f}x slower"))
+    print(f"\n📁 Store written to {csv_processor.columnar_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Extract the text of all PDF reports into the persistent text cache in parallel
+and build their full-text search indexes
+"""
+
+import argparse
+import sys
+import os
+import time
+
+# Add src to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from utils.config import config
+from data_processors.pdf_processor import PDFProcessor
+
+def main():
+    """Ingest data/reports and the PDFs in data/scenario_results, reporting throughput."""
+    parser = argparse.ArgumentParser(description="Extract PDF text into the cache with worker processes")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--pages-per-shard", type=int, default=25, help="Pages per work item (default: 25)")
+    parser.add_argument("--force", action="store_true", help="Re-extract documents that are already cached")
+    args = parser.parse_args()
+
+    print("🇨🇭 Swiss Energy Scenarios Decipher - PDF Ingestion")
+    print("=" * 60)
+    print(f"Workers: {args.workers or os.cpu_count()}, pages per shard: {args.pages_per_shard}")
+
+    directories = [config.reports_path, os.path.join(config.data_path, "scenario_results")]
+    total_pages = 0
+    total_seconds = 0.0
+
+    for directory in directories:
+        if not os.path.isdir(directory):
+            continue
+
+        pdf_processor = PDFProcessor(directory)
+        result = pdf_processor.ingest(max_workers=args.workers, pages_per_shard=args.pages_per_shard,
+                                      force=args.force)
+        total_pages += result["pages"]
+        total_seconds += result["seconds"]
+
+        print(f"\n📄 {os.path.relpath(directory, config.data_path)}")
+        print(f"   Extracted: {result['documents']} documents, {result['pages']} pages "
+              f"in {result['shards']} shards")
+        print(f"   Skipped (already cached): {result['skipped']}")
+        print(f"   Time: {result['seconds']:.2f}s, {result['pages_per_second']:.1f} pages/s")
+        for filename, error in result["errors"].items():
+            print(f"   ❌ {filename}: {error}")
+
+        start = time.perf_counter()
+        index = pdf_processor.get_search_index()
+        print(f"   Search index: {len(index.chunks)} passages, {len(index.postings)} terms "
+              f"({time.perf_counter() - start:.2f}s)")
+
+        start = time.perf_counter()
+        for filename in pdf_processor.get_available_reports():
+            try:
+                pdf_processor.get_manifest(filename)
+            except Exception as e:
+                print(f"   ❌ {filename}: {e}")
+        print(f"   Manifests: {pdf_processor.text_cache.get_stats()['manifests']} "
+              f"({time.perf_counter() - start:.2f}s)")
+
+    if total_pages:
+        print(f"\n✅ Total: {total_pages} pages in {total_seconds:.2f}s, "
+              f"{total_pages / total_seconds:.1f} pages/s")
+    else:
+        print("\n✅ Text cache is up to date (use --force to re-extract)")
+
+if __name__ == "__main__":
+    main()
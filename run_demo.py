@@ -23,6 +23,7 @@ async def demo():
         from agents.scenario_analyst_agent import ScenarioAnalystAgent
         from agents.document_intelligence_agent import DocumentIntelligenceAgent
         from agents.policy_context_agent import PolicyContextAgent
+        from data_processors.data_registry import get_data_registry
         
         print("✅ All imports successful!")
         
@@ -33,9 +34,10 @@ async def demo():
         # Initialize agents
         print("\n🤖 Initializing AI agents...")
         
-        data_interpreter = DataInterpreterAgent(config.openai_api_key, config.data_path)
-        scenario_analyst = ScenarioAnalystAgent(config.openai_api_key, config.data_path)
-        document_intelligence = DocumentIntelligenceAgent(config.openai_api_key, config.reports_path)
+        data_registry = get_data_registry(config.data_path, config.reports_path)
+        data_interpreter = DataInterpreterAgent(config.openai_api_key, config.data_path, data_registry)
+        scenario_analyst = ScenarioAnalystAgent(config.openai_api_key, config.data_path, data_registry)
+        document_intelligence = DocumentIntelligenceAgent(config.openai_api_key, config.reports_path, data_registry)
         policy_context = PolicyContextAgent(config.openai_api_key)
         
         orchestrator = OrchestratorAgent(config.openai_api_key)
@@ -45,6 +47,8 @@ async def demo():
         orchestrator.register_agent(policy_context)
         
         print("✅ All agents initialized and registered")
+        footprint = data_registry.get_memory_footprint()
+        print(f"   Shared data in memory: {footprint['total'] / 1e6:.1f} MB")
         
         # Test a simple query
         print("\n💬 Testing sample query...")
@@ -1,9 +1,28 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator, Union
 import openai
 from dataclasses import dataclass
 import json
 import asyncio
+import random
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from utils.config import config
+from utils.response_cache import ResponseCache, get_response_cache
+from utils.single_flight import SingleFlight
+from utils.llm_scheduler import PRIORITY_NORMAL, get_llm_scheduler
+from utils.circuit_breaker import get_circuit_breaker
+from utils.llm_backend import create_llm_client
+
+# Identical LLM requests in flight at the same time share one API call
+_inflight_requests = SingleFlight()
+
+# Errors worth retrying; all but rate limits also count against the backend's health
+RETRYABLE_ERRORS = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+
+# Event loop time at which the current query or agent stops waiting for its
+# LLM requests; set by the orchestrator around its time budgets
+llm_deadline: ContextVar[Optional[float]] = ContextVar("llm_deadline", default=None)
 
 @dataclass
 class AgentMessage:
@@ -20,6 +39,12 @@ class AgentResponse:
     suggestions: List[str] = None
 
 class BaseAgent(ABC):
+    # Subclasses opt in to the shared persistent response cache
+    cache_responses = False
+    
+    # Scheduling class of this agent's LLM requests (see utils.llm_scheduler)
+    llm_priority = PRIORITY_NORMAL
+    
     def __init__(self, name: str, description: str, openai_api_key: str, 
                  model: str = "gpt-4", temperature: float = 0.3, max_tokens: int = 2000):
         self.name = name
@@ -27,7 +52,14 @@ class BaseAgent(ABC):
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
-        self.client = openai.OpenAI(api_key=openai_api_key)
+        # Async client so concurrent agent calls do not block the event loop.
+        # OPENAI_BASE_URL, if set, points it at a compatible server;
+        # LLM_BACKEND=fake swaps in an in-process fake (see utils.llm_backend).
+        self.client = create_llm_client(openai_api_key)
+        self.response_cache = get_response_cache() if self.cache_responses else None
+        self.scheduler = get_llm_scheduler()
+        self.circuit_breaker = get_circuit_breaker(str(self.client.base_url))
+        self.max_retries = config.llm_max_retries
         self.system_prompt = self._build_system_prompt()
         
     @abstractmethod
@@ -40,6 +72,13 @@ class BaseAgent(ABC):
         """Process a query and return a response."""
         pass
     
+    async def prefetch(self, query: str) -> None:
+        """Speculatively load the data this agent would need for a query.
+        
+        Called before routing has finished; the default does nothing.
+        """
+        return None
+    
     def _prepare_messages(self, query: str, context: Optional[Dict[str, Any]] = None) -> List[Dict[str, str]]:
         """Prepare messages for OpenAI API call."""
         messages = [{"role": "system", "content": self.system_prompt}]
@@ -52,17 +91,146 @@ class BaseAgent(ABC):
         return messages
     
     async def _call_openai(self, messages: List[Dict[str, str]]) -> str:
-        """Make API call to OpenAI."""
+        """Make API call to OpenAI, answering from the response cache when possible.
+        
+        Concurrent identical requests are coalesced into a single call.
+        """
+        request_key = ResponseCache.make_key(
+            str(self.client.base_url), self.model, messages,
+            temperature=self.temperature, max_tokens=self.max_tokens
+        )
+        return await _inflight_requests.run(request_key, lambda: self._request_completion(messages, request_key))
+    
+    async def _request_completion(self, messages: List[Dict[str, str]], cache_key: str) -> str:
+        """Answer from the response cache or call the API and store the result."""
+        if self.response_cache is not None:
+            cached_content = self.response_cache.get(cache_key)
+            if cached_content is not None:
+                return cached_content
+        
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
+            async with self._completion(messages) as response:
+                content = response.choices[0].message.content
+        except Exception as e:
+            raise Exception(f"OpenAI API error in {self.name}: {str(e)}")
+        
+        if self.response_cache is not None and content is not None:
+            self.response_cache.put(cache_key, content, self.model)
+        return content
+    
+    async def stream_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> AsyncIterator[Union[str, AgentResponse]]:
+        """Yield response text as it is produced, then the complete AgentResponse.
+        
+        Agents without incremental output yield their whole content at once.
+        """
+        response = await self.process_query(query, context)
+        yield response.content
+        yield response
+    
+    async def _stream_openai(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """Stream an OpenAI completion chunk by chunk; cached responses arrive as one chunk."""
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = self.response_cache.make_key(
+                str(self.client.base_url), self.model, messages,
+                temperature=self.temperature, max_tokens=self.max_tokens
             )
-            return response.choices[0].message.content
+            cached_content = self.response_cache.get(cache_key)
+            if cached_content is not None:
+                yield cached_content
+                return
+        
+        parts = []
+        try:
+            # Only opening the stream is retried; chunks already shown cannot be taken back
+            async with self._completion(messages, stream=True) as stream:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                        yield delta
         except Exception as e:
             raise Exception(f"OpenAI API error in {self.name}: {str(e)}")
+        
+        if cache_key is not None and parts:
+            self.response_cache.put(cache_key, "".join(parts), self.model)
+    
+    @asynccontextmanager
+    async def _completion(self, messages: List[Dict[str, str]], stream: bool = False):
+        """Create a chat completion, retrying transient errors with jittered backoff.
+        
+        The scheduler slot is held while the caller reads the response. While
+        the circuit breaker is open, requests fail fast with CircuitOpenError.
+        """
+        for attempt in range(self.max_retries + 1):
+            is_trial = self.circuit_breaker.before_request()
+            
+            retry_after = None
+            requested = False
+            try:
+                async with self.scheduler.slot(self.model, self.llm_priority) as slot:
+                    requested = True
+                    try:
+                        response = await self.client.chat.completions.create(
+                            model=self.model,
+                            messages=messages,
+                            temperature=self.temperature,
+                            max_tokens=self.max_tokens,
+                            stream=stream
+                        )
+                    except RETRYABLE_ERRORS as e:
+                        if isinstance(e, openai.RateLimitError):
+                            retry_after = self._get_retry_after(e)
+                            slot.rate_limited(retry_after)
+                            self.circuit_breaker.record_success()  # Busy, but reachable
+                        else:
+                            self.circuit_breaker.record_failure()
+                        
+                        if attempt == self.max_retries:
+                            raise
+                    except asyncio.CancelledError:
+                        if self._deadline_passed():
+                            self.circuit_breaker.record_failure()  # Cut off by a time budget: the request timed out
+                        elif is_trial:
+                            self.circuit_breaker.release_trial()  # Abandoned by the caller; no verdict on the backend
+                        raise
+                    except Exception:
+                        self.circuit_breaker.record_success()  # The backend answered; the request was bad
+                        raise
+                    else:
+                        self.circuit_breaker.record_success()
+                        yield response
+                        return
+            except BaseException:
+                if is_trial and not requested:
+                    # Failed or cancelled while queued for a slot; the backend was never asked
+                    self.circuit_breaker.release_trial()
+                raise
+            
+            # Back off outside the slot so waiting does not block other requests
+            await asyncio.sleep(self._get_retry_delay(attempt, retry_after))
+    
+    @staticmethod
+    def _deadline_passed() -> bool:
+        deadline = llm_deadline.get()
+        # Timers may fire up to a clock tick early
+        return deadline is not None and asyncio.get_running_loop().time() >= deadline - 0.01
+    
+    @staticmethod
+    def _get_retry_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+        """Exponential backoff with full jitter, at least the server's Retry-After."""
+        delay = random.uniform(0, min(config.llm_retry_max_delay, config.llm_retry_base_delay * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+    
+    @staticmethod
+    def _get_retry_after(error: Exception) -> Optional[float]:
+        """Read the Retry-After header of a rate limit error, if any."""
+        try:
+            return float(error.response.headers.get("retry-after"))
+        except (AttributeError, TypeError, ValueError):
+            return None
     
     def _extract_confidence(self, response_text: str) -> float:
         """Extract confidence level from response text."""
@@ -1,19 +1,40 @@
 import pandas as pd
 import numpy as np
+import asyncio
 from typing import Dict, Any, List, Optional
 import os
 import json
 from agents.base_agent import BaseAgent, AgentResponse
-from data_processors.csv_processor import CSVProcessor
+from data_processors.data_registry import DataRegistry, get_data_registry
+from utils.config import config
+from utils.context_budget import ContextBuilder
+
+# Query keywords mapped to data file name patterns
+DATA_KEYWORD_MAPPINGS = {
+    'emission': ['emissions', 'ghg', 'co2', 'ch4', 'n20'],
+    'electricity': ['electricity', 'power', 'generation'],
+    'renewable': ['renewable', 'solar', 'wind', 'hydro'],
+    'transport': ['transport', 'mobility', 'vehicle', 'aviation'],
+    'building': ['building', 'heating', 'residential'],
+    'industry': ['industry', 'industrial', 'manufacturing'],
+    'cost': ['cost', 'investment', 'price'],
+    'consumption': ['consumption', 'demand', 'usage'],
+    'biomass': ['biomass', 'wood', 'waste'],
+    'heat': ['heat', 'heating', 'district_heating'],
+    'demography': ['population', 'demographic', 'economic']
+}
 
 class DataInterpreterAgent(BaseAgent):
-    def __init__(self, openai_api_key: str, data_path: str):
+    cache_responses = True
+    
+    def __init__(self, openai_api_key: str, data_path: str, data_registry: Optional[DataRegistry] = None):
         super().__init__(
             name="DataInterpreter",
             description="Analyzes energy data from CSV files, provides statistics and trends",
             openai_api_key=openai_api_key
         )
-        self.csv_processor = CSVProcessor(data_path)
+        self.data_registry = data_registry or get_data_registry(data_path)
+        self.csv_processor = self.data_registry.csv_processor
         self.data_catalog = self._build_data_catalog()
         
     def _build_system_prompt(self) -> str:
@@ -64,8 +85,15 @@ Response format:
 """
     
     def _build_data_catalog(self) -> Dict[str, Dict[str, Any]]:
-        """Build catalog of available data files."""
+        """Build catalog of available data files.
+        
+        File summaries are reused from the catalog snapshot when the file's
+        size and modification time are unchanged; only new or modified files
+        are loaded and summarized again.
+        """
         catalog = {}
+        snapshot = self._load_catalog_snapshot()
+        updated_snapshot = {}
         
         try:
             files = self.csv_processor.get_available_files()
@@ -73,17 +101,54 @@ Response format:
             for category in ['synthesis', 'transformation']:
                 catalog[category] = {}
                 for filename in files.get(category, []):
-                    try:
-                        summary = self.csv_processor.get_data_summary(filename, category)
-                        catalog[category][filename] = summary
-                    except Exception as e:
-                        print(f"Error cataloging {filename}: {e}")
+                    key = f"{category}/{filename}"
+                    file_stat = os.stat(self.csv_processor._get_file_path(filename, category))
+                    entry = snapshot.get(key)
+                    
+                    if not entry or entry.get('size') != file_stat.st_size or entry.get('mtime') != file_stat.st_mtime:
+                        entry = {'size': file_stat.st_size, 'mtime': file_stat.st_mtime}
+                        try:
+                            entry['summary'] = self.csv_processor.get_data_summary(filename, category)
+                        except Exception as e:
+                            # Remember the failure so the file is not re-parsed on every start
+                            entry['error'] = str(e)
+                            print(f"Error cataloging {filename}: {e}")
+                            
+                    updated_snapshot[key] = entry
+                    if 'summary' in entry:
+                        catalog[category][filename] = entry['summary']
                         
         except Exception as e:
             print(f"Error building data catalog: {e}")
             
+        if updated_snapshot != snapshot:
+            self._save_catalog_snapshot(updated_snapshot)
+            
         return catalog
     
+    def _get_catalog_snapshot_path(self) -> str:
+        return os.path.join(self.csv_processor.cache_path, "data_catalog.json")
+    
+    def _load_catalog_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Load the persisted catalog snapshot, or an empty one."""
+        try:
+            with open(self._get_catalog_snapshot_path(), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_catalog_snapshot(self, snapshot: Dict[str, Dict[str, Any]]):
+        """Persist the catalog snapshot keyed by file path, size and mtime."""
+        snapshot_path = self._get_catalog_snapshot_path()
+        try:
+            os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+            # Write to a temporary file first so a crash never leaves a truncated snapshot
+            with open(snapshot_path + ".tmp", 'w', encoding='utf-8') as file:
+                json.dump(snapshot, file, ensure_ascii=False, default=str)
+            os.replace(snapshot_path + ".tmp", snapshot_path)
+        except OSError as e:
+            print(f"Error saving data catalog snapshot: {e}")
+    
     async def process_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> AgentResponse:
         """Process data analysis query."""
         # Identify relevant data files
@@ -104,33 +169,27 @@ Response format:
         
         return response
     
+    async def prefetch(self, query: str) -> None:
+        """Load the files relevant to a query into the shared cache in the background."""
+        relevant_files = self._identify_relevant_data(query)
+        await asyncio.gather(
+            *(asyncio.to_thread(self.csv_processor.load_csv, file_info['filename'], file_info['category'])
+              for file_info in relevant_files),
+            return_exceptions=True
+        )
+    
     def _identify_relevant_data(self, query: str) -> List[Dict[str, str]]:
         """Identify which data files are relevant to the query."""
         query_lower = query.lower()
         relevant_files = []
         
-        # Keywords mapping to file patterns
-        keyword_mappings = {
-            'emission': ['emissions', 'ghg', 'co2', 'ch4', 'n20'],
-            'electricity': ['electricity', 'power', 'generation'],
-            'renewable': ['renewable', 'solar', 'wind', 'hydro'],
-            'transport': ['transport', 'mobility', 'vehicle', 'aviation'],
-            'building': ['building', 'heating', 'residential'],
-            'industry': ['industry', 'industrial', 'manufacturing'],
-            'cost': ['cost', 'investment', 'price'],
-            'consumption': ['consumption', 'demand', 'usage'],
-            'biomass': ['biomass', 'wood', 'waste'],
-            'heat': ['heat', 'heating', 'district_heating'],
-            'demography': ['population', 'demographic', 'economic']
-        }
-        
         # Check each file in catalog
         for category, files in self.data_catalog.items():
             for filename, file_info in files.items():
                 file_relevance = 0
                 
                 # Check filename relevance
-                for keyword, patterns in keyword_mappings.items():
+                for keyword, patterns in DATA_KEYWORD_MAPPINGS.items():
                     if keyword in query_lower:
                         for pattern in patterns:
                             if pattern in filename.lower():
@@ -207,8 +266,7 @@ Response format:
                                      relevant_files: List[Dict[str, str]]) -> AgentResponse:
         """Generate response based on data analysis."""
         # Prepare analysis summary for LLM
-        analysis_summary = json.dumps(analysis_results, indent=2, default=str)
-        files_summary = json.dumps([f"{f['filename']} (relevance: {f['relevance']})" for f in relevant_files])
+        analysis_summary = self._build_analysis_context(query, analysis_results, relevant_files)
         
         response_prompt = f"""
         Based on the data analysis for the query: "{query}"
@@ -216,9 +274,6 @@ Response format:
         Analysis Results:
         {analysis_summary}
         
-        Data Sources Used:
-        {files_summary}
-        
         Provide a comprehensive data-driven response that:
         1. Directly answers the user's question with specific numbers
         2. Identifies key trends and patterns
@@ -250,6 +305,44 @@ Response format:
             suggestions=suggestions
         )
     
+    def _build_analysis_context(self, query: str, analysis_results: Dict[str, Any],
+                                relevant_files: List[Dict[str, str]]) -> str:
+        """Render the analysis results as compact tables within the prompt token budget.
+        
+        Files keep their relevance order; each file's variables are listed
+        with those matching query words first.
+        """
+        builder = ContextBuilder(config.prompt_context_max_tokens)
+        summaries = analysis_results['data_summary']
+        statistics = analysis_results['key_statistics']
+        query_words = [word for word in query.lower().split() if len(word) > 2]
+        
+        rows = []
+        for file_info in relevant_files:
+            filename = file_info['filename']
+            if filename not in summaries:
+                continue
+            summary = summaries[filename]
+            stats = statistics.get(filename, {})
+            years = summary['years']
+            rows.append([
+                filename, file_info['relevance'], f"{years[0]}-{years[1]}" if years else None,
+                summary['shape'][0], summary['scenarios'], stats.get('earliest_value'),
+                stats.get('latest_value'), stats.get('mean_value'), stats.get('growth_rate')
+            ])
+        builder.add_table(
+            "Data sources",
+            ["file", "relevance", "years", "rows", "scenarios", "earliest", "latest", "mean", "growth %/yr"],
+            rows, priority=1
+        )
+        
+        for file_info in relevant_files:
+            variables = summaries.get(file_info['filename'], {}).get('variables', [])
+            ranked = sorted(variables, key=lambda variable: not any(word in variable.lower() for word in query_words))
+            builder.add_text(f"Variables in {file_info['filename']}", ranked)
+        
+        return builder.build()
+    
     def _calculate_confidence(self, analysis_results: Dict[str, Any], 
                             relevant_files: List[Dict[str, str]]) -> float:
         """Calculate confidence score based on data quality."""
@@ -1,16 +1,36 @@
+import asyncio
 from typing import Dict, Any, List, Optional
 import json
+import os
 from agents.base_agent import BaseAgent, AgentResponse
-from data_processors.pdf_processor import PDFProcessor
+from data_processors.data_registry import DataRegistry, get_data_registry
+
+# Query keywords mapped to report file name patterns
+DOCUMENT_KEYWORD_MAPPINGS = {
+    'methodology': ['technischer', 'technical', 'method'],
+    'summary': ['kurzbericht', 'summary', 'overview'],
+    'facts': ['faktenblatt', 'fact', 'data'],
+    'biomass': ['biomasse', 'biomass'],
+    'winter': ['winter', 'winterstrom'],
+    'ccs': ['ccs', 'net'],
+    'stakeholder': ['stellungnahmen', 'begleitgruppe'],
+    'economic': ['vwl', 'economic', 'ecoplan']
+}
+
+# Detected language codes mapped to the names used in the catalog
+LANGUAGE_NAMES = {"de": "German", "fr": "French", "it": "Italian", "en": "English"}
 
 class DocumentIntelligenceAgent(BaseAgent):
-    def __init__(self, openai_api_key: str, reports_path: str):
+    cache_responses = True
+    
+    def __init__(self, openai_api_key: str, reports_path: str, data_registry: Optional[DataRegistry] = None):
         super().__init__(
             name="DocumentIntelligence", 
             description="Processes PDF reports and extracts knowledge from technical documents",
             openai_api_key=openai_api_key
         )
-        self.pdf_processor = PDFProcessor(reports_path)
+        self.data_registry = data_registry or get_data_registry(os.path.dirname(reports_path), reports_path)
+        self.pdf_processor = self.data_registry.pdf_processor
         self.document_catalog = self._build_document_catalog()
         
     def _build_system_prompt(self) -> str:
@@ -84,7 +104,7 @@ Response format:
                     catalog[report] = {
                         "type": doc_type,
                         "summary": summary,
-                        "language": self._detect_language(report)
+                        "language": self._detect_language(report, summary)
                     }
                     
                 except Exception as e:
@@ -112,8 +132,13 @@ Response format:
         else:
             return "General Report"
     
-    def _detect_language(self, filename: str) -> str:
-        """Detect document language from filename."""
+    def _detect_language(self, filename: str, summary: Optional[Dict[str, Any]] = None) -> str:
+        """Detect document language from its text, falling back to the filename."""
+        if summary and summary.get("language_confidence", 0) > 0:
+            language = LANGUAGE_NAMES.get(summary.get("language"))
+            if language:
+                return language
+        
         if '_DE' in filename or 'deutsch' in filename.lower():
             return "German"
         elif '_FR' in filename or 'french' in filename.lower():
@@ -143,28 +168,24 @@ Response format:
         
         return response
     
+    async def prefetch(self, query: str) -> None:
+        """Load (or on first use build) the report search index in the background.
+        
+        Queries read passages through the index, not the full document text.
+        """
+        if self._identify_relevant_documents(query):
+            await asyncio.to_thread(self.pdf_processor.get_search_index)
+    
     def _identify_relevant_documents(self, query: str) -> List[Dict[str, Any]]:
         """Identify documents relevant to the query."""
         query_lower = query.lower()
         relevant_docs = []
         
-        # Keywords for document relevance
-        keyword_mappings = {
-            'methodology': ['technischer', 'technical', 'method'],
-            'summary': ['kurzbericht', 'summary', 'overview'],
-            'facts': ['faktenblatt', 'fact', 'data'],
-            'biomass': ['biomasse', 'biomass'],
-            'winter': ['winter', 'winterstrom'],
-            'ccs': ['ccs', 'net'],
-            'stakeholder': ['stellungnahmen', 'begleitgruppe'],
-            'economic': ['vwl', 'economic', 'ecoplan']
-        }
-        
         for doc_name, doc_info in self.document_catalog.items():
             relevance_score = 0
             
             # Check filename relevance
-            for query_keyword, doc_patterns in keyword_mappings.items():
+            for query_keyword, doc_patterns in DOCUMENT_KEYWORD_MAPPINGS.items():
                 if query_keyword in query_lower:
                     for pattern in doc_patterns:
                         if pattern in doc_name.lower():
@@ -201,8 +222,9 @@ Response format:
             filename = doc_info['filename']
             
             try:
-                # Search for query-relevant text in the document
-                search_results = self.pdf_processor.search_text(query, filename)
+                # Search for query-relevant text in the document; building the
+                # index on first use parses the reports, so keep it off the event loop
+                search_results = await asyncio.to_thread(self.pdf_processor.search_text, query, filename)
                 
                 if search_results:
                     extracted_info[filename] = {
@@ -213,7 +235,7 @@ Response format:
                     }
                 else:
                     # If no direct matches, get document overview
-                    text_preview = self.pdf_processor.extract_text(filename)[:1000]
+                    text_preview = await asyncio.to_thread(self.pdf_processor.get_text_preview, filename, 1000)
                     extracted_info[filename] = {
                         'type': doc_info['info']['type'],
                         'language': doc_info['info']['language'],
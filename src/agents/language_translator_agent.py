@@ -6,10 +6,24 @@ to enable multilingual query processing and response generation.
 """
 
 import asyncio
-from typing import Dict, Any, Optional, List
+import json
+import re
+from typing import Dict, Any, Optional, List, AsyncIterator
 from .base_agent import BaseAgent, AgentResponse
+from utils.language_detection import detect_language as detect_language_locally
+from utils.translation_memory import GLOSSARY, get_translation_memory
+from utils.llm_scheduler import PRIORITY_INTERACTIVE
 
 class LanguageTranslatorAgent(BaseAgent):
+    cache_responses = True
+    llm_priority = PRIORITY_INTERACTIVE
+    
+    # Below this confidence the local detector defers to the LLM
+    local_detection_threshold = 0.6
+    
+    # Parallel per-segment requests when a batch reply cannot be parsed
+    batch_fallback_concurrency = 4
+    
     def __init__(self, openai_api_key: str):
         super().__init__(
             name="LanguageTranslator",
@@ -26,8 +40,16 @@ class LanguageTranslatorAgent(BaseAgent):
             "fr": "French (Français)",
             "it": "Italian (Italiano)"
         }
+        
+        # Known translations are answered without a model call
+        self.translation_memory = get_translation_memory()
     
     def _build_system_prompt(self) -> str:
+        glossary = "\n".join(
+            f"- {term}: " + ", ".join(f"{code}: {translation}" for code, translation in translations.items())
+            for term, translations in GLOSSARY.items()
+        )
+        
         return """You are a professional translator specializing in Swiss energy and climate policy terminology. 
         
 Your role is to provide accurate translations between English, German, French, and Italian, with particular expertise in:
@@ -51,8 +73,15 @@ You will receive requests in this format:
 - "detect_language: {text}" 
 - "translate_query: {text} | target_language: {language_code}"
 - "translate_response: {text} | target_language: {language_code}"
+- "translate_batch: {JSON array of texts} | target_language: {language_code}"
+
+For translate_batch, reply with only a JSON array of the translated texts, in the same
+order and with exactly as many elements as the input array.
+
+Supported language codes: en (English), de (German), fr (French), it (Italian)
 
-Supported language codes: en (English), de (German), fr (French), it (Italian)"""
+GLOSSARY (always use these translations):
+""" + glossary
 
     async def process_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> AgentResponse:
         """Process translation request."""
@@ -77,26 +106,47 @@ Supported language codes: en (English), de (German), fr (French), it (Italian)""
             )
     
     async def detect_language(self, text: str) -> str:
-        """Detect the language of the input text."""
+        """Detect the language of the input text.
+        
+        Clear-cut texts are classified locally; the LLM is only asked when
+        the local confidence is below local_detection_threshold.
+        """
+        local_language = self.detect_language_offline(text)
+        if local_language is not None:
+            return local_language
+        
+        language, confidence = detect_language_locally(text)
         query = f"detect_language: {text}"
         response = await self.process_query(query)
         
-        # Extract language code from response
+        # Extract language code from response; match whole words only, since
+        # a code like "en" is a substring of many English words
         content = response.content.lower()
         for code, name in self.supported_languages.items():
-            if code in content or name.lower() in content:
+            language_name = name.split(" (")[0].lower()
+            if re.search(rf"\b({code}|{language_name})\b", content):
                 return code
         
-        return "en"  # Default to English if detection fails
+        return language if confidence > 0 else "en"  # Default to English if detection fails
+    
+    def detect_language_offline(self, text: str) -> Optional[str]:
+        """Return the language code if the local detector is confident, else None."""
+        language, confidence = detect_language_locally(text)
+        return language if confidence >= self.local_detection_threshold else None
     
     async def translate_to_english(self, text: str, source_language: str = None) -> str:
         """Translate any supported language to English."""
+        remembered = self._recall(text, "en")
+        if remembered is not None:
+            return remembered
+        
         if source_language:
             query = f"translate_to_en: {text} (from {self.supported_languages.get(source_language, source_language)})"
         else:
             query = f"translate_to_en: {text}"
         
         response = await self.process_query(query)
+        self._remember(text, "en", response)
         return response.content
     
     async def translate_from_english(self, text: str, target_language: str) -> str:
@@ -107,10 +157,15 @@ Supported language codes: en (English), de (German), fr (French), it (Italian)""
         if target_language == "en":
             return text  # No translation needed
         
+        remembered = self._recall(text, target_language)
+        if remembered is not None:
+            return remembered
+        
         target_name = self.supported_languages[target_language]
         query = f"translate_to_{target_language}: {text} (to {target_name})"
         
         response = await self.process_query(query)
+        self._remember(text, target_language, response)
         return response.content
     
     async def translate_query(self, query_text: str, target_language: str = "en") -> str:
@@ -123,11 +178,112 @@ Supported language codes: en (English), de (German), fr (French), it (Italian)""
         """Translate an agent response, preserving technical terminology."""
         if target_language == "en":
             return response_text
+        
+        remembered = self._recall(response_text, target_language)
+        if remembered is not None:
+            return remembered
             
         query = f"translate_response: {response_text} | target_language: {target_language}"
         response = await self.process_query(query)
+        self._remember(response_text, target_language, response)
         return response.content
     
+    async def stream_translation(self, response_text: str, target_language: str = "en") -> AsyncIterator[str]:
+        """Yield the translation of an agent response as it is produced."""
+        if target_language == "en":
+            yield response_text
+            return
+        
+        remembered = self._recall(response_text, target_language)
+        if remembered is not None:
+            yield remembered
+            return
+        
+        query = f"translate_response: {response_text} | target_language: {target_language}"
+        parts = []
+        async for chunk in self._stream_openai(self._prepare_messages(query)):
+            parts.append(chunk)
+            yield chunk
+        
+        translation = "".join(parts).strip()
+        self._remember(response_text, target_language, AgentResponse(
+            content=translation,
+            confidence=self._calculate_translation_confidence(query, translation)
+        ))
+    
+    async def translate_batch(self, segments: List[str], target_language: str = "en") -> List[str]:
+        """Translate several response segments with a single request.
+        
+        Segment boundaries are kept: the result has one translation per input
+        segment, in order. If the batch reply cannot be parsed, the segments
+        are translated individually with bounded concurrency.
+        """
+        if target_language == "en" or target_language not in self.supported_languages:
+            return list(segments)
+        
+        translations = list(segments)
+        positions = []
+        for i, segment in enumerate(segments):
+            # Only send segments that contain text and are not yet translated
+            if not segment or not segment.strip():
+                continue
+            remembered = self._recall(segment, target_language)
+            if remembered is not None:
+                translations[i] = remembered
+            else:
+                positions.append(i)
+        
+        if not positions:
+            return translations
+        
+        texts = [segments[i] for i in positions]
+        query = f"translate_batch: {json.dumps(texts, ensure_ascii=False)} | target_language: {target_language}"
+        response = await self.process_query(query)
+        translated = self._parse_batch_response(response.content, len(texts))
+        
+        if translated is not None and self.translation_memory is not None:
+            for text, translation in zip(texts, translated):
+                self.translation_memory.put(text, target_language, translation)
+        
+        if translated is None:
+            semaphore = asyncio.Semaphore(self.batch_fallback_concurrency)
+            
+            async def translate_one(text: str) -> str:
+                async with semaphore:
+                    return await self.translate_response(text, target_language)
+            
+            translated = await asyncio.gather(*(translate_one(text) for text in texts))
+        
+        for position, text in zip(positions, translated):
+            translations[position] = text
+        return translations
+    
+    def _recall(self, text: str, target_language: str) -> Optional[str]:
+        """Look up a stored translation."""
+        if self.translation_memory is None:
+            return None
+        return self.translation_memory.get(text, target_language)
+    
+    def _remember(self, text: str, target_language: str, response: AgentResponse):
+        """Store a translation unless the model call failed."""
+        if self.translation_memory is not None and response.confidence > 0.2:
+            self.translation_memory.put(text, target_language, response.content)
+    
+    def _parse_batch_response(self, content: str, expected_count: int) -> Optional[List[str]]:
+        """Read the JSON array of a batch reply; None if it does not match the input."""
+        match = re.search(r"\[.*\]", content, re.DOTALL)
+        if not match:
+            return None
+        
+        try:
+            translated = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return None
+        
+        if not isinstance(translated, list) or len(translated) != expected_count:
+            return None
+        return [str(text) for text in translated]
+    
     def _calculate_translation_confidence(self, query: str, response: str) -> float:
         """Calculate confidence level for translation quality."""
         base_confidence = 0.8
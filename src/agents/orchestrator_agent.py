@@ -1,12 +1,31 @@
 import asyncio
-from typing import Dict, Any, List, Optional
+import hashlib
+import json
+import time
+from typing import Dict, Any, List, Optional, AsyncIterator, Union
 import re
-from agents.base_agent import BaseAgent, AgentResponse
+from agents.base_agent import BaseAgent, AgentResponse, llm_deadline
 from agents.language_translator_agent import LanguageTranslatorAgent
+from agents.query_router import QueryRouter
+from utils.single_flight import SingleFlight
+from utils.llm_scheduler import PRIORITY_INTERACTIVE
+from utils.config import config
 
 class OrchestratorAgent(BaseAgent):
-    def __init__(self, openai_api_key: str, agents_registry: Dict[str, BaseAgent] = None):
+    cache_responses = True
+    llm_priority = PRIORITY_INTERACTIVE
+    
+    # Share of the query time budget the specialist agents may use, leaving time for synthesis
+    agent_budget_share = 0.75
+    
+    def __init__(self, openai_api_key: str, agents_registry: Dict[str, BaseAgent] = None,
+                 agent_timeouts: Optional[Dict[str, float]] = None):
         self.agents_registry = agents_registry or {}
+        
+        # Latency budgets in seconds; 0 or None means no limit
+        self.agent_timeout = config.agent_timeout_seconds
+        self.agent_timeouts = agent_timeouts or {}  # Per-agent overrides
+        self.query_timeout = config.query_timeout_seconds
         super().__init__(
             name="Orchestrator",
             description="Central coordinator that routes queries to appropriate specialist agents",
@@ -16,6 +35,12 @@ class OrchestratorAgent(BaseAgent):
         # Initialize built-in language translator
         self.translator = LanguageTranslatorAgent(openai_api_key)
         
+        # Local router answers confident routing decisions without an LLM call
+        self.router = QueryRouter()
+        
+        # Shares one pipeline run between concurrent identical queries
+        self.inflight_queries = SingleFlight()
+        
     def register_agent(self, agent: BaseAgent):
         """Register a specialist agent."""
         self.agents_registry[agent.name] = agent
@@ -60,75 +85,307 @@ Adapt your communication style based on user type:
 """
     
     async def process_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> AgentResponse:
-        """Process query with multilingual support and route to appropriate agents."""
+        """Process query with multilingual support and route to appropriate agents.
+        
+        Identical queries (same text and context) arriving while one is being
+        processed share its result instead of running the pipeline again.
+        """
+        request_key = self._get_request_key(query, context)
+        return await self.inflight_queries.run(request_key, lambda: self._process_query(query, context))
+    
+    @staticmethod
+    def _get_request_key(query: str, context: Optional[Dict[str, Any]]) -> str:
+        """Key identical queries by their whitespace-normalized text and context."""
+        return hashlib.sha256(json.dumps(
+            {"query": " ".join(query.split()), "context": context or {}},
+            sort_keys=True, ensure_ascii=False, default=str
+        ).encode("utf-8")).hexdigest()
+    
+    async def _process_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> AgentResponse:
+        """Run the full multilingual pipeline for one query within the query time budget."""
         # Get user language from context
         user_language = context.get("language", "en") if context else "en"
-        original_query = query
+        deadline = self._get_deadline()
+        deadline_token = llm_deadline.set(deadline)
+        
+        try:
+            return await asyncio.wait_for(
+                self._run_pipeline(query, context, user_language, self._get_deadline(self.agent_budget_share)),
+                self._time_left(deadline)
+            )
+        except asyncio.TimeoutError:
+            return await self._error_response(
+                Exception(f"no answer within the {self.query_timeout:g}s time budget"), user_language
+            )
+        except Exception as e:
+            return await self._error_response(e, user_language)
+        finally:
+            llm_deadline.reset(deadline_token)
+    
+    async def _run_pipeline(self, query: str, context: Optional[Dict[str, Any]], user_language: str,
+                            agents_deadline: Optional[float]) -> AgentResponse:
+        timings = {}
+        start = time.perf_counter()
+        
+        # Steps 1-3: Detect language, route and query the specialist agents
+        query, query_language, routing_decision, agent_responses = await self._gather_agent_responses(
+            query, context, timings, agents_deadline
+        )
+        
+        # Step 4: Synthesize response in English first
+        english_response = await self._timed(
+            "synthesis", self._synthesize_response(query, agent_responses, routing_decision), timings
+        )
+        
+        # Step 5: Translate final response to user's preferred language
+        if user_language != "en":
+            # Content and suggestions go out in one batch request
+            suggestions = english_response.suggestions or []
+            translated_segments = await self._timed("translation", self.translator.translate_batch(
+                [english_response.content] + suggestions, user_language
+            ), timings)
+            
+            final_response = self._localize_response(
+                english_response, translated_segments[0], translated_segments[1:],
+                query_language, user_language
+            )
+        else:
+            final_response = english_response
+        
+        timings["total"] = time.perf_counter() - start
+        return self._with_timings(final_response, timings)
+    
+    async def stream_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> AsyncIterator[Union[str, AgentResponse]]:
+        """Yield the answer text as it is generated, then the complete AgentResponse.
+        
+        Routing and the specialist agents run as in process_query; the synthesis
+        (or, for non-English users, the translation) is streamed token by token.
+        Identical queries arriving while one is being streamed receive the same
+        chunks instead of running the pipeline again.
+        """
+        request_key = self._get_request_key(query, context)
+        async for chunk in self.inflight_queries.stream(request_key, lambda: self._stream_query(query, context)):
+            yield chunk
+    
+    async def _stream_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> AsyncIterator[Union[str, AgentResponse]]:
+        """Run the pipeline for one query within the query time budget, streaming its answer."""
+        user_language = context.get("language", "en") if context else "en"
+        deadline = self._get_deadline()
+        deadline_token = llm_deadline.set(deadline)
+        chunks = self._stream_pipeline(query, context, user_language, self._get_deadline(self.agent_budget_share))
+        streamed = False
+        
+        try:
+            while True:
+                try:
+                    # The budget covers the whole stream; each chunk may use what is left of it
+                    chunk = await asyncio.wait_for(chunks.__anext__(), self._time_left(deadline))
+                except StopAsyncIteration:
+                    return
+                streamed = streamed or isinstance(chunk, str)
+                yield chunk
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                e = Exception(f"no answer within the {self.query_timeout:g}s time budget")
+            response = await self._error_response(e, user_language)
+            # Text already shown stays; the error follows it
+            yield f"\n\n{response.content}" if streamed else response.content
+            yield response
+        finally:
+            await chunks.aclose()
+            llm_deadline.reset(deadline_token)
+    
+    async def _stream_pipeline(self, query: str, context: Optional[Dict[str, Any]], user_language: str,
+                               agents_deadline: Optional[float]) -> AsyncIterator[Union[str, AgentResponse]]:
+        timings = {}
+        start = time.perf_counter()
+        
+        query, query_language, routing_decision, agent_responses = await self._gather_agent_responses(
+            query, context, timings, agents_deadline
+        )
+        
+        if user_language == "en":
+            stage_start = time.perf_counter()
+            async for chunk in self._stream_synthesis(query, agent_responses, routing_decision):
+                if isinstance(chunk, AgentResponse):
+                    timings["synthesis"] = time.perf_counter() - stage_start
+                    timings["total"] = time.perf_counter() - start
+                    chunk = self._with_timings(chunk, timings)
+                yield chunk
+            return
+        
+        english_response = await self._timed(
+            "synthesis", self._synthesize_response(query, agent_responses, routing_decision), timings
+        )
+        
+        stage_start = time.perf_counter()
+        parts = []
+        async for chunk in self.translator.stream_translation(english_response.content, user_language):
+            parts.append(chunk)
+            yield chunk
+        
+        translated_suggestions = await self.translator.translate_batch(
+            english_response.suggestions or [], user_language
+        )
+        timings["translation"] = time.perf_counter() - stage_start
+        timings["total"] = time.perf_counter() - start
+        
+        yield self._with_timings(self._localize_response(
+            english_response, "".join(parts).strip(), translated_suggestions,
+            query_language, user_language
+        ), timings)
+    
+    async def _gather_agent_responses(self, query: str, context: Optional[Dict[str, Any]] = None,
+                                      timings: Optional[Dict[str, float]] = None,
+                                      deadline: Optional[float] = None):
+        """Translate the query to English, route it and collect the agent responses.
+        
+        The steps run as a dependency graph: routing and speculative data
+        retrieval only need the English query, so they start as soon as it is
+        known. For queries the local detector cannot classify they start right
+        away on the assumption that the query is English, and are restarted on
+        the translation if the LLM detects another language.
+        
+        Returns (English query, detected query language, routing decision, agent responses).
+        """
+        timings = timings if timings is not None else {}
+        routing = prefetch = None
+        # Background tasks still running when the query fails or runs out of
+        # time are cancelled, so they stop holding LLM scheduler slots
+        tasks = []
         
         try:
             # Step 1: Detect query language and translate to English for processing
-            query_language = await self.translator.detect_language(query)
+            stage_start = time.perf_counter()
+            query_language = self.translator.detect_language_offline(query)
+            
+            if query_language is None:
+                detection = asyncio.create_task(
+                    self._timed("language_detection", self.translator.detect_language(query), timings)
+                )
+                tasks.append(detection)
+                routing, prefetch = self._start_routing(query, context, timings)
+                tasks += [routing, prefetch]
+                query_language = await detection
+                
+                if query_language != "en":
+                    # The speculative work used the untranslated query
+                    routing.cancel()
+                    prefetch.cancel()
+                    routing = prefetch = None
+            else:
+                timings["language_detection"] = time.perf_counter() - stage_start
             
             if query_language != "en":
                 # Translate query to English for agent processing
-                query = await self.translator.translate_to_english(query, query_language)
-                
-            # Step 2: Analyze query to determine routing
-            routing_decision = await self._analyze_query_routing(query, context)
+                query = await self._timed(
+                    "query_translation", self.translator.translate_to_english(query, query_language), timings
+                )
             
-            # Step 3: Route to appropriate agents (using English query)
-            agent_responses = await self._route_to_agents(query, routing_decision, context)
+            # Step 2: Analyze query to determine routing, while the agents' data loads
+            if routing is None:
+                routing, prefetch = self._start_routing(query, context, timings)
+                tasks += [routing, prefetch]
+            routing_decision = await routing
             
-            # Step 4: Synthesize response in English first
-            english_response = await self._synthesize_response(query, agent_responses, routing_decision)
+            # Step 3: Route to appropriate agents (using English query)
+            agent_responses = await self._timed(
+                "agents", self._route_to_agents(query, routing_decision, context, deadline), timings
+            )
+            await prefetch
             
-            # Step 5: Translate final response to user's preferred language
-            if user_language != "en":
-                translated_content = await self.translator.translate_response(
-                    english_response.content, user_language
-                )
-                
-                # Translate suggestions if they exist
-                translated_suggestions = []
-                if english_response.suggestions:
-                    for suggestion in english_response.suggestions:
-                        translated_suggestion = await self.translator.translate_response(
-                            suggestion, user_language
-                        )
-                        translated_suggestions.append(translated_suggestion)
-                
-                # Create multilingual response
-                final_response = AgentResponse(
-                    content=translated_content,
-                    confidence=english_response.confidence,
-                    data_sources=english_response.data_sources,
-                    reasoning=f"Multilingual processing: Query detected as {self.translator.supported_languages.get(query_language, 'unknown')}, " +
-                             f"processed in English, translated to {self.translator.supported_languages.get(user_language, 'unknown')}. " +
-                             (english_response.reasoning or ""),
-                    suggestions=translated_suggestions
-                )
-            else:
-                final_response = english_response
+            return query, query_language, routing_decision, agent_responses
+        finally:
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+    
+    def _start_routing(self, query: str, context: Optional[Dict[str, Any]], timings: Dict[str, float]):
+        """Start routing and speculative data retrieval for a query as concurrent tasks."""
+        routing = asyncio.create_task(
+            self._timed("routing", self._analyze_query_routing(query, context), timings)
+        )
+        prefetch = asyncio.create_task(
+            self._timed("prefetch", self._prefetch_agent_data(query), timings)
+        )
+        return routing, prefetch
+    
+    async def _prefetch_agent_data(self, query: str):
+        """Let the agents the query plausibly needs load their data before routing decides."""
+        scores = self.router.score_agents(query)
+        agents = [agent for name, agent in self.agents_registry.items() if scores.get(name, 0.0) >= 1.0]
+        
+        results = await asyncio.gather(*(agent.prefetch(query) for agent in agents), return_exceptions=True)
+        for agent, result in zip(agents, results):
+            if isinstance(result, Exception):
+                print(f"Error prefetching data for {agent.name}: {result}")
+    
+    async def _timed(self, stage: str, awaitable, timings: Dict[str, float]):
+        """Await a pipeline stage and record its duration."""
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            timings[stage] = time.perf_counter() - start
+    
+    def _get_deadline(self, share: float = 1.0) -> Optional[float]:
+        """Event loop time at which a share of the query time budget is used up, or None."""
+        if not self.query_timeout:
+            return None
+        return asyncio.get_running_loop().time() + self.query_timeout * share
+    
+    def _time_left(self, deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        return max(0.0, deadline - asyncio.get_running_loop().time())
+    
+    def _with_timings(self, response: AgentResponse, timings: Dict[str, float]) -> AgentResponse:
+        """Append the per-stage timings to the response reasoning."""
+        stages = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items())
+        response.reasoning = f"{response.reasoning or ''} Stage timings: {stages}.".strip()
+        return response
+    
+    def _localize_response(self, english_response: AgentResponse, translated_content: str,
+                           translated_suggestions: List[str], query_language: str, user_language: str) -> AgentResponse:
+        """Create the multilingual response from its translated parts."""
+        return AgentResponse(
+            content=translated_content,
+            confidence=english_response.confidence,
+            data_sources=english_response.data_sources,
+            reasoning=f"Multilingual processing: Query detected as {self.translator.supported_languages.get(query_language, 'unknown')}, " +
+                     f"processed in English, translated to {self.translator.supported_languages.get(user_language, 'unknown')}. " +
+                     (english_response.reasoning or ""),
+            suggestions=translated_suggestions
+        )
+    
+    async def _error_response(self, error: Exception, user_language: str) -> AgentResponse:
+        """Fallback: return error in user's language."""
+        error_message = f"Error processing multilingual query: {str(error)}"
+        # Past the query deadline the English message is sent rather than waiting for a translation
+        if user_language != "en" and not self._deadline_passed():
+            try:
+                error_message = await self.translator.translate_response(error_message, user_language)
+            except:
+                pass  # Use English error if translation fails
                 
-            return final_response
-            
-        except Exception as e:
-            # Fallback: return error in user's language
-            error_message = f"Error processing multilingual query: {str(e)}"
-            if user_language != "en":
-                try:
-                    error_message = await self.translator.translate_response(error_message, user_language)
-                except:
-                    pass  # Use English error if translation fails
-                    
-            return AgentResponse(
-                content=error_message,
-                confidence=0.0,
-                reasoning=f"Multilingual processing failed: {str(e)}"
-            )
+        return AgentResponse(
+            content=error_message,
+            confidence=0.0,
+            reasoning=f"Multilingual processing failed: {str(error)}"
+        )
     
     async def _analyze_query_routing(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Analyze query to determine which agents to route to."""
+        """Analyze query to determine which agents to route to.
+        
+        The local router decides first; the LLM is only asked when it is uncertain.
+        """
+        routing_info = self.router.route(query, context, list(self.agents_registry.keys()))
+        if routing_info is not None:
+            return routing_info
+        
+        start = time.perf_counter()
         analysis_prompt = f"""
         Analyze this query about Swiss energy scenarios and determine which agents should handle it:
         
@@ -166,27 +423,42 @@ Adapt your communication style based on user type:
                 "data_needs": ["csv_data"]
             }
             
+        self.router.record_escalation(time.perf_counter() - start)
+        routing_info["routed_by"] = "llm"
         return routing_info
     
+    def get_routing_stats(self) -> Dict[str, Any]:
+        """Report how much routing traffic the local router resolves."""
+        return self.router.get_stats()
+    
     async def _route_to_agents(self, query: str, routing_decision: Dict[str, Any], 
-                              context: Optional[Dict[str, Any]] = None) -> Dict[str, AgentResponse]:
-        """Route query to appropriate agents in parallel."""
+                              context: Optional[Dict[str, Any]] = None,
+                              deadline: Optional[float] = None) -> Dict[str, AgentResponse]:
+        """Route query to appropriate agents in parallel.
+        
+        Each agent gets its own time budget, capped by the query deadline.
+        Agents that miss it are cancelled and listed under "timed_out_agents"
+        in the routing decision.
+        """
         agent_responses = {}
         tasks = []
         
         for agent_name in routing_decision.get("primary_agents", []):
             if agent_name in self.agents_registry:
                 agent = self.agents_registry[agent_name]
-                task = agent.process_query(query, context)
+                task = self._run_agent(agent, query, context, deadline)
                 tasks.append((agent_name, task))
         
         # Execute agent queries in parallel
+        timed_out_agents = []
         if tasks:
             results = await asyncio.gather(*[task for _, task in tasks], return_exceptions=True)
             
             for i, (agent_name, _) in enumerate(tasks):
                 result = results[i]
-                if isinstance(result, Exception):
+                if isinstance(result, asyncio.TimeoutError):
+                    timed_out_agents.append(agent_name)
+                elif isinstance(result, Exception):
                     agent_responses[agent_name] = AgentResponse(
                         content=f"Error in {agent_name}: {str(result)}",
                         confidence=0.0,
@@ -196,31 +468,99 @@ Adapt your communication style based on user type:
                 else:
                     agent_responses[agent_name] = result
         
+        routing_decision["timed_out_agents"] = timed_out_agents
         return agent_responses
     
+    async def _run_agent(self, agent: BaseAgent, query: str, context: Optional[Dict[str, Any]],
+                         deadline: Optional[float]) -> AgentResponse:
+        """Run one agent, cancelling it when its time budget runs out."""
+        budgets = [self.agent_timeouts.get(agent.name, self.agent_timeout) or None, self._time_left(deadline)]
+        budgets = [budget for budget in budgets if budget is not None]
+        
+        if not budgets:
+            return await agent.process_query(query, context)
+        
+        # Requests the budget cuts off count as timeouts against the backend
+        deadline_token = llm_deadline.set(asyncio.get_running_loop().time() + min(budgets))
+        try:
+            return await asyncio.wait_for(agent.process_query(query, context), min(budgets))
+        finally:
+            llm_deadline.reset(deadline_token)
+    
     async def _synthesize_response(self, query: str, agent_responses: Dict[str, AgentResponse], 
                                   routing_decision: Dict[str, Any]) -> AgentResponse:
-        """Synthesize responses from multiple agents into coherent answer."""
+        """Synthesize responses from multiple agents into coherent answer.
+        
+        Agents that missed their time budget are left out and named in the reasoning.
+        """
+        missing_agents = routing_decision.get("timed_out_agents", [])
+        
         if not agent_responses:
-            return AgentResponse(
-                content="I'm sorry, I couldn't process your query. Please try rephrasing it.",
+            if missing_agents:
+                content = "I'm sorry, the specialists did not answer in time. Please try again or ask a narrower question."
+            else:
+                content = "I'm sorry, I couldn't process your query. Please try rephrasing it."
+            return self._mark_missing_agents(AgentResponse(
+                content=content,
                 confidence=0.1,
                 data_sources=[],
                 suggestions=["Try asking about specific energy data or scenarios"]
-            )
+            ), missing_agents)
         
         # If only one agent responded, return its response with orchestrator context
         if len(agent_responses) == 1:
             agent_name, response = next(iter(agent_responses.items()))
-            return AgentResponse(
-                content=response.content,
+            content = response.content
+            if missing_agents:
+                content += (f"\n\nNote: {', '.join(missing_agents)} did not respond in time, "
+                            "so this answer may be incomplete.")
+            return self._mark_missing_agents(AgentResponse(
+                content=content,
                 confidence=response.confidence,
                 data_sources=response.data_sources,
                 reasoning=f"Routed to {agent_name}: {response.reasoning}",
                 suggestions=response.suggestions
-            )
+            ), missing_agents)
         
         # Synthesize multiple responses
+        messages = self._prepare_messages(self._build_synthesis_prompt(query, agent_responses, routing_decision))
+        synthesized_content = await self._call_openai(messages)
+        
+        return self._mark_missing_agents(
+            self._combine_agent_responses(synthesized_content, agent_responses), missing_agents
+        )
+    
+    async def _stream_synthesis(self, query: str, agent_responses: Dict[str, AgentResponse],
+                                routing_decision: Dict[str, Any]) -> AsyncIterator[Union[str, AgentResponse]]:
+        """Stream the synthesized answer, then yield the complete AgentResponse."""
+        if len(agent_responses) <= 1:
+            # Nothing to synthesize, the answer is already complete
+            response = await self._synthesize_response(query, agent_responses, routing_decision)
+            yield response.content
+            yield response
+            return
+        
+        messages = self._prepare_messages(self._build_synthesis_prompt(query, agent_responses, routing_decision))
+        parts = []
+        async for chunk in self._stream_openai(messages):
+            parts.append(chunk)
+            yield chunk
+        
+        yield self._mark_missing_agents(
+            self._combine_agent_responses("".join(parts), agent_responses),
+            routing_decision.get("timed_out_agents", [])
+        )
+    
+    def _mark_missing_agents(self, response: AgentResponse, missing_agents: List[str]) -> AgentResponse:
+        """Name the agents that missed their time budget in the response reasoning."""
+        if missing_agents:
+            response.reasoning = (f"{response.reasoning or ''} "
+                                  f"No response within the time budget from: {', '.join(missing_agents)}.").strip()
+        return response
+    
+    def _build_synthesis_prompt(self, query: str, agent_responses: Dict[str, AgentResponse],
+                                routing_decision: Dict[str, Any]) -> str:
+        """Build the prompt that merges several specialist responses."""
         synthesis_prompt = f"""
         Synthesize these specialist responses into a coherent answer for the user query: "{query}"
         
@@ -233,6 +573,11 @@ Adapt your communication style based on user type:
         for agent_name, response in agent_responses.items():
             synthesis_prompt += f"\n{agent_name}:\n{response.content}\n"
         
+        missing_agents = routing_decision.get("timed_out_agents", [])
+        if missing_agents:
+            synthesis_prompt += (f"\nNo response arrived in time from: {', '.join(missing_agents)}. "
+                                 "Mention that the answer may be incomplete in their areas.\n")
+        
         synthesis_prompt += """
         
         Provide a synthesized response that:
@@ -243,9 +588,11 @@ Adapt your communication style based on user type:
         5. Suggests relevant follow-up questions
         """
         
-        messages = self._prepare_messages(synthesis_prompt)
-        synthesized_content = await self._call_openai(messages)
-        
+        return synthesis_prompt
+    
+    def _combine_agent_responses(self, synthesized_content: str,
+                                 agent_responses: Dict[str, AgentResponse]) -> AgentResponse:
+        """Attach the merged confidence, sources and suggestions to a synthesized answer."""
         # Calculate average confidence
         avg_confidence = sum(r.confidence for r in agent_responses.values()) / len(agent_responses)
         
@@ -267,4 +614,4 @@ Adapt your communication style based on user type:
             data_sources=list(set(all_sources)),
             reasoning=f"Synthesized from {', '.join(agent_responses.keys())}",
             suggestions=list(set(suggestions))[:3]  # Limit to 3 suggestions
-        )
\ No newline at end of file
+        )
@@ -3,6 +3,8 @@ import json
 from agents.base_agent import BaseAgent, AgentResponse
 
 class PolicyContextAgent(BaseAgent):
+    cache_responses = True
+    
     def __init__(self, openai_api_key: str):
         super().__init__(
             name="PolicyContext",
@@ -0,0 +1,194 @@
+"""
+Local query router for the Swiss Energy Scenarios Decipher System.
+
+Scores each specialist agent with the keyword maps the agents already use
+for their own lookups plus a small TF-IDF model over example queries, so
+most routing decisions need no LLM call. Uncertain queries are escalated
+to the orchestrator's LLM router.
+"""
+
+import math
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from agents.data_interpreter_agent import DATA_KEYWORD_MAPPINGS
+from agents.scenario_analyst_agent import VARIABLE_KEYWORDS
+from agents.document_intelligence_agent import DOCUMENT_KEYWORD_MAPPINGS
+
+AGENT_KEYWORDS = {
+    "DataInterpreter": sorted(
+        set(DATA_KEYWORD_MAPPINGS) | set(VARIABLE_KEYWORDS) | {"statistic", "trend", "how much", "how many",
+                                      "data", "growth", "share", "figure", "number"}
+    ),
+    "ScenarioAnalyst": ["scenario", "zero", "wwb", "kkw50", "compare", "comparison",
+                        "difference", "differ", "pathway", "variant", "versus", "vs",
+                        "business as usual", "net-zero", "net zero"],
+    "DocumentIntelligence": sorted(
+        set(DOCUMENT_KEYWORD_MAPPINGS) | {"report", "document", "study", "assumption",
+                                          "technical", "according to", "source", "method"}
+    ),
+    "PolicyContext": ["policy", "policies", "regulation", "law", "act", "legislation",
+                      "commitment", "paris", "instrument", "subsidy", "subsidies", "levy", "measure",
+                      "government", "federal", "canton", "cantonal", "implementation", "political",
+                      "strategy 2050", "incentive"],
+}
+
+# Example queries per agent for the TF-IDF model (from the CLI help)
+AGENT_EXAMPLES = {
+    "DataInterpreter": [
+        "What are Switzerland's CO2 emissions in 2030 under the ZERO scenario?",
+        "How does electricity consumption change by sector from 2020 to 2050?",
+        "Compare renewable energy growth between scenarios",
+        "Show me transport energy consumption trends",
+    ],
+    "ScenarioAnalyst": [
+        "What's the difference between ZERO-Basis and WWB scenarios?",
+        "How do scenarios differ in nuclear power assumptions?",
+        "Compare costs between energy transition pathways",
+        "What are the implications of delayed climate action?",
+    ],
+    "DocumentIntelligence": [
+        "What methodology is used for scenario modeling?",
+        "Explain the assumptions about biomass availability",
+        "What do the technical reports say about winter electricity?",
+        "Find information about carbon capture and storage",
+    ],
+    "PolicyContext": [
+        "What policies are needed to achieve net-zero by 2050?",
+        "How does the CO2 Act support the energy transition?",
+        "What are the implementation challenges for renewable energy?",
+        "Explain Switzerland's climate commitments",
+    ],
+}
+
+AGENT_QUERY_TYPES = {
+    "DataInterpreter": "data_analysis",
+    "ScenarioAnalyst": "scenario_comparison",
+    "DocumentIntelligence": "document_search",
+    "PolicyContext": "policy_question",
+}
+
+AGENT_DATA_NEEDS = {
+    "DataInterpreter": "csv_data",
+    "ScenarioAnalyst": "scenario_comparison",
+    "DocumentIntelligence": "pdf_reports",
+    "PolicyContext": "policy_context",
+}
+
+STOPWORDS = {"the", "and", "are", "what", "how", "does", "for", "with", "about", "from",
+             "between", "which", "this", "that", "into", "under", "by", "of", "in", "to"}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9\-]+")
+
+def _keyword_pattern(keyword: str) -> "re.Pattern":
+    """Match a keyword as a whole word, allowing a plural ending."""
+    return re.compile(rf"\b{re.escape(keyword)}(s|es)?\b")
+
+def _tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+class QueryRouter:
+    """Routes queries to specialist agents without an LLM call when confident."""
+
+    def __init__(self, confidence_threshold: float = 0.5):
+        self.confidence_threshold = confidence_threshold
+        self._keyword_patterns = {
+            agent: [_keyword_pattern(keyword) for keyword in keywords]
+            for agent, keywords in AGENT_KEYWORDS.items()
+        }
+        self._idf, self._agent_vectors = self._build_tfidf_model()
+
+        self.resolved_locally = 0
+        self.escalated = 0
+        self.local_seconds = 0.0
+        self.llm_seconds = 0.0
+
+    def _build_tfidf_model(self):
+        """Build one TF-IDF vector per agent from its keywords and example queries."""
+        documents = {
+            agent: _tokenize(" ".join(AGENT_EXAMPLES[agent] + AGENT_KEYWORDS[agent]))
+            for agent in AGENT_KEYWORDS
+        }
+        document_frequency = Counter(term for tokens in documents.values() for term in set(tokens))
+        total = len(documents)
+        idf = {term: math.log((1 + total) / (1 + count)) + 1 for term, count in document_frequency.items()}
+
+        vectors = {agent: self._vectorize(tokens, idf) for agent, tokens in documents.items()}
+        return idf, vectors
+
+    @staticmethod
+    def _vectorize(tokens: List[str], idf: Dict[str, float]) -> Dict[str, float]:
+        counts = Counter(token for token in tokens if token in idf)
+        vector = {term: count * idf[term] for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        return {term: weight / norm for term, weight in vector.items()}
+
+    def score_agents(self, query: str) -> Dict[str, float]:
+        """Score each agent: keyword hits plus weighted TF-IDF similarity."""
+        query_lower = query.lower()
+        query_vector = self._vectorize(_tokenize(query), self._idf)
+        scores = {}
+
+        for agent, patterns in self._keyword_patterns.items():
+            keyword_hits = sum(1 for pattern in patterns if pattern.search(query_lower))
+            similarity = sum(weight * self._agent_vectors[agent].get(term, 0.0)
+                             for term, weight in query_vector.items())
+            scores[agent] = keyword_hits + 2.0 * similarity
+
+        return scores
+
+    def route(self, query: str, context: Optional[Dict[str, Any]] = None,
+              available_agents: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Return a routing decision, or None when the LLM should decide."""
+        start = time.perf_counter()
+        scores = self.score_agents(query)
+        if available_agents is not None:
+            scores = {agent: score for agent, score in scores.items() if agent in available_agents}
+
+        decision = None
+        if scores:
+            best = max(scores.values())
+            confidence = min(1.0, best / 2.0)
+
+            if confidence >= self.confidence_threshold:
+                # Keep every agent that scores close to the best one
+                agents = [agent for agent, score in sorted(scores.items(), key=lambda item: -item[1])
+                          if score >= max(1.0, 0.6 * best)]
+                decision = {
+                    "primary_agents": agents,
+                    "query_type": AGENT_QUERY_TYPES[agents[0]] if len(agents) == 1 else "complex",
+                    "complexity": "simple" if len(agents) == 1 else ("medium" if len(agents) == 2 else "complex"),
+                    "user_type": (context or {}).get("user_type", "citizen"),
+                    "data_needs": [AGENT_DATA_NEEDS[agent] for agent in agents],
+                    "routed_by": "local",
+                    "routing_confidence": round(confidence, 2)
+                }
+
+        self.local_seconds += time.perf_counter() - start
+        if decision is not None:
+            self.resolved_locally += 1
+        return decision
+
+    def record_escalation(self, seconds: float):
+        """Record the latency of a routing decision that needed the LLM."""
+        self.escalated += 1
+        self.llm_seconds += seconds
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Report the share of traffic routed locally and the estimated time saved."""
+        total = self.resolved_locally + self.escalated
+        average_local = self.local_seconds / total if total else 0.0
+        average_llm = self.llm_seconds / self.escalated if self.escalated else None
+
+        return {
+            "queries": total,
+            "resolved_locally": self.resolved_locally,
+            "escalated": self.escalated,
+            "local_fraction": self.resolved_locally / total if total else 0.0,
+            "average_local_ms": average_local * 1000,
+            "average_llm_ms": average_llm * 1000 if average_llm is not None else None,
+            # Only measurable once at least one query went to the LLM router
+            "estimated_seconds_saved": (average_llm - average_local) * self.resolved_locally
+                                       if average_llm is not None else None
+        }
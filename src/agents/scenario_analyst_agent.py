@@ -1,17 +1,69 @@
+import asyncio
+import re
 from typing import Dict, Any, List, Optional
 import pandas as pd
-import json
 from agents.base_agent import BaseAgent, AgentResponse
-from data_processors.csv_processor import CSVProcessor
+from data_processors.data_registry import DataRegistry, get_data_registry
+from data_processors.text_index import tokenize
+from utils.config import config
+from utils.context_budget import ContextBuilder
+
+# Comparison variables and the query keywords that select them
+VARIABLE_KEYWORDS = {
+    'emissions': ['emissions', 'carbon', 'co2', 'ghg'],
+    'electricity': ['electricity', 'power', 'generation'],
+    'renewable': ['renewable', 'solar', 'wind', 'hydro'],
+    'transport': ['transport', 'mobility', 'vehicle'],
+    'heating': ['heating', 'heat', 'buildings'],
+    'cost': ['cost', 'investment', 'price'],
+    'consumption': ['consumption', 'demand', 'energy']
+}
+
+# English query topics and the German dimension labels that carry them in the data
+DIMENSION_TERMS = {
+    'electricity': ['Elektrizität', 'Strom'],
+    'power': ['Strom', 'Kraftwerke'],
+    'solar': ['Photovoltaik', 'Solarthermie'],
+    'wind': ['Wind'],
+    'hydro': ['Wasserkraft'],
+    'nuclear': ['Kernkraft', 'Kernbrennstoffe'],
+    'gas': ['Erdgas', 'Biogas'],
+    'oil': ['Erdöl', 'Heizöl', 'Mineralöle'],
+    'hydrogen': ['Wasserstoff'],
+    'biomass': ['Biomasse', 'Holz'],
+    'heat pump': ['Wärmepumpen'],
+    'heating': ['Raumwärme', 'Warmwasser', 'Wärme'],
+    'district heating': ['Fernwärme'],
+    'transport': ['Verkehr', 'Mobilität'],
+    'road': ['Strassenverkehr'],
+    'car': ['Pkw'],
+    'rail': ['Schiene', 'Bahn'],
+    'aviation': ['Flugverkehr'],
+    'household': ['Haushalte'],
+    'industry': ['Industrie'],
+    'services': ['Dienstleistungen'],
+    'agriculture': ['Landwirtschaft'],
+    'building': ['Gebäude'],
+    'waste': ['Abfall', 'Kehricht'],
+    'renewable': ['Erneuerbare'],
+    'consumption': ['Verbrauch'],
+    'investment': ['Investitionen'],
+}
+
+# Years shown when comparing scenarios in prompts
+MILESTONE_YEARS = (2020, 2030, 2040, 2050)
 
 class ScenarioAnalystAgent(BaseAgent):
-    def __init__(self, openai_api_key: str, data_path: str):
+    cache_responses = True
+    
+    def __init__(self, openai_api_key: str, data_path: str, data_registry: Optional[DataRegistry] = None):
         super().__init__(
             name="ScenarioAnalyst",
             description="Compares scenarios, analyzes pathways and policy implications",
             openai_api_key=openai_api_key
         )
-        self.csv_processor = CSVProcessor(data_path)
+        self.data_registry = data_registry or get_data_registry(data_path)
+        self.csv_processor = self.data_registry.csv_processor
         self.scenario_info = self._load_scenario_metadata()
         
     def _build_system_prompt(self) -> str:
@@ -107,6 +159,10 @@ Response format:
         
         return analysis
     
+    async def prefetch(self, query: str) -> None:
+        """Load the fact table used for scenario comparisons in the background."""
+        await asyncio.to_thread(self.csv_processor.get_fact_table)
+    
     def _identify_scenarios(self, query: str) -> List[str]:
         """Identify which scenarios are relevant to the query."""
         query_lower = query.lower()
@@ -133,19 +189,14 @@ Response format:
         
         for variable in key_variables:
             try:
-                # Search for files containing this variable
-                relevant_files = self.csv_processor.search_data_by_keywords([variable])
+                # One filter over the fact table covers every file matching this variable
+                scenario_data = self.csv_processor.query_facts(keywords=[variable], scenarios=scenarios)
                 
-                for file_path, df in relevant_files.items():
-                    if 'scenario' in df.columns and 'value' in df.columns:
-                        # Filter for relevant scenarios
-                        scenario_data = df[df['scenario'].isin(scenarios)]
+                for file_path, file_data in scenario_data.groupby('dataset', observed=True):
+                    if variable not in comparison_data:
+                        comparison_data[variable] = {}
                         
-                        if not scenario_data.empty:
-                            if variable not in comparison_data:
-                                comparison_data[variable] = {}
-                                
-                            comparison_data[variable][file_path] = scenario_data.to_dict('records')
+                    comparison_data[variable][file_path] = file_data.drop(columns=['dataset'])
                             
             except Exception as e:
                 print(f"Error gathering data for {variable}: {e}")
@@ -157,18 +208,8 @@ Response format:
         """Identify key variables for scenario comparison based on query."""
         query_lower = query.lower()
         
-        variable_keywords = {
-            'emissions': ['emissions', 'carbon', 'co2', 'ghg'],
-            'electricity': ['electricity', 'power', 'generation'],
-            'renewable': ['renewable', 'solar', 'wind', 'hydro'],
-            'transport': ['transport', 'mobility', 'vehicle'],
-            'heating': ['heating', 'heat', 'buildings'],
-            'cost': ['cost', 'investment', 'price'],
-            'consumption': ['consumption', 'demand', 'energy']
-        }
-        
         identified_variables = []
-        for variable, keywords in variable_keywords.items():
+        for variable, keywords in VARIABLE_KEYWORDS.items():
             if any(keyword in query_lower for keyword in keywords):
                 identified_variables.append(variable)
         
@@ -182,6 +223,9 @@ Response format:
                                 comparison_data: Dict[str, Any]) -> AgentResponse:
         """Perform detailed scenario analysis."""
         
+        # Tabulating the comparison is CPU work; keep it off the event loop
+        comparison_context = await asyncio.to_thread(self._build_comparison_context, query, comparison_data)
+        
         # Prepare analysis context
         analysis_prompt = f"""
         Perform a comprehensive scenario analysis for the query: "{query}"
@@ -189,10 +233,10 @@ Response format:
         Scenarios to compare: {', '.join(scenarios)}
         
         Scenario Metadata:
-        {json.dumps({s: self.scenario_info.get(s, {}) for s in scenarios}, indent=2)}
+        {self._format_scenario_metadata(scenarios)}
         
         Comparison Data Available:
-        {json.dumps(comparison_data, indent=2, default=str)[:2000]}...
+        {comparison_context}
         
         Provide a detailed analysis that:
         1. Summarizes key differences between scenarios
@@ -226,6 +270,124 @@ Response format:
             suggestions=suggestions
         )
     
+    def _format_scenario_metadata(self, scenarios: List[str]) -> str:
+        """One line per scenario with its description, features and targets."""
+        lines = []
+        for scenario in scenarios:
+            info = self.scenario_info.get(scenario)
+            if not info:
+                continue
+            targets = "; ".join(f"{key}: {value}" for key, value in info.get('targets', {}).items())
+            lines.append(f"{scenario}: {info.get('description', '')}. "
+                         f"Features: {'; '.join(info.get('key_features', []))}. Targets: {targets}")
+        return "\n".join(lines)
+    
+    def _get_ranking_terms(self, query: str) -> List[str]:
+        """Folded query terms, plus the German label vocabulary of the English topics the query names."""
+        terms = tokenize(query)
+        query_lower = query.lower()
+        for topic, labels in DIMENSION_TERMS.items():
+            if re.search(rf"\b{re.escape(topic)}(s|es)?\b", query_lower):
+                terms.extend(tokenize(" ".join(labels)))
+        return sorted({term for term in terms if len(term) > 2 and not term.isdigit()})
+    
+    @staticmethod
+    def _label_relevance(label: Any, terms: List[str]) -> int:
+        """Number of ranking terms found in a dimension label."""
+        text = " ".join(tokenize(str(label)))
+        return sum(1 for term in terms if term in text)
+    
+    @staticmethod
+    def _drop_repeated_rows(table: pd.DataFrame) -> pd.DataFrame:
+        """Drop numbered rows that only repeat an earlier row of their key (same values or missing)."""
+        repeated = table.index.droplevel('occurrence').duplicated(keep=False)
+        dropped = []
+        for _, group in table[repeated].groupby(level=['dimension_value', 'unit'], observed=True):
+            kept = []
+            for row, values in zip(group.index, group.to_numpy()):
+                if any(((values == other) | pd.isna(values)).all() for other in kept):
+                    dropped.append(row)
+                else:
+                    kept.append(values)
+        return table.drop(index=dropped)
+    
+    def _build_comparison_context(self, query: str, comparison_data: Dict[str, Any]) -> str:
+        """Tabulate the comparison data at milestone years within the prompt token budget.
+        
+        One table per variable and file: a row per dimension value, a column
+        per scenario (and variant, where there are several) and year. Rows
+        sharing a key come from a flattened parent dimension (fuel by
+        purpose) or are different measures with one label (two target
+        ratios), so summing them is not safe: exact repeats are dropped and
+        the rest numbered in file order. Rows and tables matching query terms
+        come first, then rows by magnitude, so truncation keeps what the
+        question is about.
+        """
+        builder = ContextBuilder(config.prompt_context_max_tokens)
+        terms = self._get_ranking_terms(query)
+        
+        # Labels recur across variables and files; score each once
+        relevance: Dict[Any, int] = {}
+        sections = []
+        for variable, datasets in comparison_data.items():
+            for file_path, data in datasets.items():
+                if data.empty:
+                    continue
+                section_labels = data['dimension_value'].dropna().unique()
+                for label in section_labels:
+                    if label not in relevance:
+                        relevance[label] = self._label_relevance(label, terms)
+                sections.append((max((relevance[label] for label in section_labels), default=0),
+                                 variable, file_path, data))
+        sections.sort(key=lambda section: -section[0])
+        
+        for section_relevance, variable, file_path, data in sections:
+            if builder.is_full():
+                builder.omitted_sections += 1
+                continue
+            
+            years = [year for year in MILESTONE_YEARS if (data['year'] == year).any()] or [data['year'].max()]
+            data = data[data['year'].isin(years)]
+            columns = ['scenario', 'year'] if data['variant'].nunique() <= 1 else ['scenario', 'variant', 'year']
+            data = data.dropna(subset=['dimension_value', 'unit'])
+            # Rows sharing a key are told apart by their order within it
+            key = ['dimension_value', 'unit', *columns]
+            occurrence = data.groupby(key, observed=True).cumcount().rename('occurrence')
+            table = data.set_index([*key[:2], occurrence, *columns])['value'].unstack(columns)
+            table = self._drop_repeated_rows(table)
+            
+            rows_index = table.index.to_frame(index=False)
+            dimensions = rows_index['dimension_value'].tolist()
+            row_units = rows_index['unit'].astype(str).tolist()
+            labels_group = rows_index.groupby(['dimension_value', 'unit'], observed=True)
+            numbers = (labels_group.cumcount() + 1).tolist()
+            repeats = labels_group['occurrence'].transform('size').tolist()
+            magnitude = table.abs().max(axis=1).fillna(0).to_numpy()
+            group_magnitude = pd.Series(magnitude).groupby(labels_group.ngroup().to_numpy()).transform('max').tolist()
+            # Numbered rows of one key stay together
+            order = sorted(range(len(table)), key=lambda i: (
+                -relevance.get(dimensions[i], 0), -group_magnitude[i], str(dimensions[i]), row_units[i], numbers[i]
+            ))
+            table = table.iloc[order]
+            
+            units = table.index.get_level_values('unit').unique()
+            labels = [" ".join(str(int(part)) if isinstance(part, float) else str(part) for part in column)
+                      for column in table.columns]
+            dimensions = [f"{dimensions[i]} ({numbers[i]} of {repeats[i]})" if repeats[i] > 1 else dimensions[i]
+                          for i in order]
+            if len(units) == 1:
+                title = f"{variable}: {file_path} [{units[0]}]"
+                header = [table.index.names[0]] + labels
+                rows = [[dimension, *values] for dimension, values in zip(dimensions, table.values.tolist())]
+            else:
+                title = f"{variable}: {file_path}"
+                header = ['dimension_value', 'unit'] + labels
+                rows = [[dimension, unit, *values]
+                        for dimension, (_, unit, _), values in zip(dimensions, table.index, table.values.tolist())]
+            builder.add_table(title, header, rows, priority=section_relevance)
+        
+        return builder.build()
+    
     def _calculate_scenario_confidence(self, scenarios: List[str], 
                                      comparison_data: Dict[str, Any]) -> float:
         """Calculate confidence in scenario analysis."""
@@ -1,15 +1,49 @@
 import pandas as pd
+import numpy as np
 import os
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import glob
+import threading
 from pathlib import Path
+from data_processors.memory_cache import MemoryBudgetCache
+
+# Columns kept as plain numbers in the columnar store; every other text
+# column (scenario, variant, unit, fuel, sector, ...) becomes a categorical.
+NUMERIC_COLUMNS = ['year', 'value']
+
+# Columns shared by every extracted file; anything else is a dimension column
+FACT_COLUMNS = ['scenario', 'variant', 'year', 'unit', 'value']
+
+# Code columns that accompany a descriptive label column (e.g. crf_id + crf)
+DIMENSION_CODE_COLUMNS = ['crf_id', 'noga']
+
+FACT_TABLE_COLUMNS = ['dataset', 'dimension_name', 'dimension_value',
+                      'scenario', 'variant', 'year', 'unit', 'value']
+
+# Bump when the fact row layout changes, so persisted tables are rebuilt
+FACT_TABLE_VERSION = 2
+
+# Cached in place of the index of a file without a scenario column
+_NO_INDEX = "no_index"
 
 class CSVProcessor:
-    def __init__(self, data_path: str):
+    def __init__(self, data_path: str, cache_path: Optional[str] = None, use_columnar: bool = True,
+                 cache: Optional[MemoryBudgetCache] = None):
         self.data_path = data_path
         self.synthesis_path = os.path.join(data_path, "extracted", "synthesis")
         self.transformation_path = os.path.join(data_path, "extracted", "transformation")
-        self._cache = {}
+        self.cache_path = cache_path or os.path.join(data_path, "cache")
+        self.columnar_path = os.path.join(self.cache_path, "columnar")
+        self.use_columnar = use_columnar
+        self.fact_table_path = os.path.join(self.cache_path, f"fact_table_v{FACT_TABLE_VERSION}.parquet")
+        # Any dict-like cache works; the default is an unbounded LRU cache.
+        # Row indexes share it with the frames, under "index_<cache key>"
+        self._cache = cache if cache is not None else MemoryBudgetCache()
+        self._fact_table = None
+        # Guards the per-key locks; a per-key lock makes concurrent first
+        # loads of the same file wait for one parse instead of repeating it
+        self._lock = threading.Lock()
+        self._key_locks = {}
         
     def get_available_files(self) -> Dict[str, List[str]]:
         """Get list of available CSV files organized by category."""
@@ -30,23 +64,128 @@ class CSVProcessor:
         """Load a specific CSV file."""
         cache_key = f"{category}_{filename}"
         
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        df = self._cache.get(cache_key)
+        if df is not None:
+            return df
             
+        with self._get_key_lock(cache_key):
+            # Another thread may have loaded the file while we waited
+            if cache_key in self._cache:
+                df = self._cache.get(cache_key)
+                if df is not None:
+                    return df
+                
+            file_path = self._get_file_path(filename, category)
+                
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(f"File {filename} not found in {category} category")
+                
+            df = self._read_columnar(filename, category) if self.use_columnar else None
+            if df is None:
+                df = pd.read_csv(file_path)
+            self._cache[cache_key] = df
+            return df
+    
+    def _get_key_lock(self, key: str) -> threading.Lock:
+        """Return the lock serializing the first load of a cache key."""
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+    
+    def _get_file_path(self, filename: str, category: str) -> str:
+        """Resolve the CSV path of a file in the given category."""
         if category == "synthesis":
-            file_path = os.path.join(self.synthesis_path, filename)
+            return os.path.join(self.synthesis_path, filename)
         elif category == "transformation":
-            file_path = os.path.join(self.transformation_path, filename)
+            return os.path.join(self.transformation_path, filename)
         else:
             raise ValueError("Category must be 'synthesis' or 'transformation'")
+    
+    def _get_columnar_file_path(self, filename: str, category: str) -> str:
+        """Resolve the Parquet path that mirrors a CSV file in the columnar store."""
+        return os.path.join(self.columnar_path, category, Path(filename).stem + ".parquet")
+    
+    def _read_columnar(self, filename: str, category: str) -> Optional[pd.DataFrame]:
+        """Read the columnar copy of a CSV file, or None if it is missing or stale."""
+        csv_path = self._get_file_path(filename, category)
+        columnar_path = self._get_columnar_file_path(filename, category)
+        
+        if not os.path.exists(columnar_path):
+            return None
+        if os.path.getmtime(columnar_path) < os.path.getmtime(csv_path):
+            return None
             
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File {filename} not found in {category} category")
+        try:
+            import pyarrow.parquet as pq
+            # The files are small, so pd.read_parquet's dataset discovery and
+            # thread pool cost more than the read itself
+            table = pq.ParquetFile(columnar_path, memory_map=True).read(use_threads=False)
+            return table.to_pandas(use_threads=False)
+        except Exception as e:
+            # pyarrow not installed or unreadable file - fall back to the CSV
+            print(f"Error reading columnar copy of {filename}: {e}")
+            return None
+    
+    @staticmethod
+    def _to_columnar_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+        """Convert text columns to categoricals and downcast the year column."""
+        df = df.copy()
+        for column in df.columns:
+            if column in NUMERIC_COLUMNS:
+                continue
+            if pd.api.types.is_object_dtype(df[column]) or pd.api.types.is_string_dtype(df[column]):
+                df[column] = df[column].astype("category")
+                
+        if 'year' in df.columns and pd.api.types.is_integer_dtype(df['year']):
+            df['year'] = pd.to_numeric(df['year'], downcast='integer')
             
-        df = pd.read_csv(file_path)
-        self._cache[cache_key] = df
         return df
     
+    def build_columnar_store(self) -> Dict[str, List[str]]:
+        """Convert every extracted CSV file into a typed Parquet file.
+        
+        Text columns are stored as dictionary-encoded categoricals. Once built,
+        load_csv reads the Parquet copy instead of re-parsing the CSV.
+        """
+        built = {}
+        files = self.get_available_files()
+        
+        for category, filenames in files.items():
+            built[category] = []
+            os.makedirs(os.path.join(self.columnar_path, category), exist_ok=True)
+            
+            for filename in filenames:
+                try:
+                    df = pd.read_csv(self._get_file_path(filename, category))
+                    df = self._to_columnar_dtypes(df)
+                    df.to_parquet(self._get_columnar_file_path(filename, category), index=False)
+                    built[category].append(filename)
+                except Exception as e:
+                    print(f"Error converting {filename}: {e}")
+                    
+        # Drop cached frames so subsequent loads use the new store
+        self._cache.clear()
+        return built
+    
+    def get_memory_usage(self) -> Dict[str, int]:
+        """Report the bytes held by loaded frames, indexes and the fact table."""
+        values = list(self._cache.values())
+        frames = [value for value in values if isinstance(value, pd.DataFrame)]
+        indexes = [value for value in values if isinstance(value, dict)]
+        fact_table = self._fact_table
+        
+        return {
+            "frames": int(sum(df.memory_usage(deep=True).sum() for df in frames)),
+            "indexes": int(sum(index['positions'].nbytes +
+                               (index['years'].nbytes if index['years'] is not None else 0)
+                               for index in indexes)),
+            "fact_table": int(fact_table.memory_usage(deep=True).sum()) if fact_table is not None else 0
+        }
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters of the DataFrame cache."""
+        get_stats = getattr(self._cache, "get_stats", None)
+        return get_stats() if get_stats else {"entries": len(self._cache)}
+    
     def search_data_by_keywords(self, keywords: List[str], category: Optional[str] = None) -> Dict[str, pd.DataFrame]:
         """Search for data files containing specific keywords."""
         results = {}
@@ -73,11 +212,96 @@ class CSVProcessor:
         variants = df['variant'].unique().tolist() if 'variant' in df.columns else []
         return scenarios, variants
     
+    def _get_index(self, filename: str, category: str = "synthesis") -> Optional[Dict[str, Any]]:
+        """Build (once) a scenario/variant/year index over a file.
+        
+        Rows are ordered by scenario, variant and year through a permutation
+        array, so each (scenario, variant) pair maps to a contiguous slice in
+        which years are sorted. The DataFrame itself is not copied.
+        """
+        index_key = f"index_{category}_{filename}"
+        
+        index = self._cache.get(index_key)
+        if index is None:
+            with self._get_key_lock(index_key):
+                index = self._cache.get(index_key)
+                if index is None:
+                    index = self._build_index(filename, category)
+                    self._cache[index_key] = index
+                
+        return None if index is _NO_INDEX else index
+    
+    def _build_index(self, filename: str, category: str) -> Any:
+        df = self.load_csv(filename, category)
+        
+        if 'scenario' not in df.columns:
+            return _NO_INDEX
+            
+        keys = ['scenario', 'variant'] if 'variant' in df.columns else ['scenario']
+        has_years = 'year' in df.columns and pd.api.types.is_numeric_dtype(df['year'])
+        sort_columns = keys + (['year'] if has_years else [])
+        
+        positions = (df[sort_columns].reset_index(drop=True)
+                     .sort_values(sort_columns, kind='mergesort').index.to_numpy())
+        
+        # Group boundaries are the positions where any key changes
+        codes = np.column_stack([pd.factorize(df[key].to_numpy()[positions])[0] for key in keys])
+        starts = np.r_[0, np.flatnonzero(np.any(codes[1:] != codes[:-1], axis=1)) + 1]
+        stops = np.r_[starts[1:], len(positions)]
+        
+        groups = {}
+        for start, stop in zip(starts, stops):
+            first_row = positions[start]
+            scenario = df['scenario'].iloc[first_row]
+            variant = df['variant'].iloc[first_row] if 'variant' in df.columns else None
+            groups[(scenario, variant)] = (int(start), int(stop))
+            
+        index = {
+            'positions': positions,
+            'groups': groups,
+            'years': df['year'].to_numpy()[positions] if has_years else None,
+            'has_variant': 'variant' in df.columns
+        }
+        return index
+    
+    def _select_positions(self, index: Dict[str, Any], scenarios: Optional[List[str]] = None,
+                          variant: Optional[str] = None,
+                          year_range: Optional[Tuple[int, int]] = None) -> np.ndarray:
+        """Collect row positions for the matching index slices, in file order."""
+        selected = []
+        
+        for (group_scenario, group_variant), (start, stop) in index['groups'].items():
+            if scenarios and group_scenario not in scenarios:
+                continue
+            if variant and index['has_variant'] and group_variant != variant:
+                continue
+                
+            if year_range:
+                start_year, end_year = year_range
+                years = index['years'][start:stop]
+                start, stop = (start + int(np.searchsorted(years, start_year, side='left')),
+                               start + int(np.searchsorted(years, end_year, side='right')))
+                
+            selected.append(index['positions'][start:stop])
+            
+        if not selected:
+            return np.array([], dtype=np.int64)
+        return np.sort(np.concatenate(selected))
+    
     def filter_data(self, filename: str, category: str = "synthesis", 
                    scenario: Optional[str] = None, variant: Optional[str] = None,
                    year_range: Optional[Tuple[int, int]] = None) -> pd.DataFrame:
         """Filter data by scenario, variant, and year range."""
         df = self.load_csv(filename, category)
+        index = self._get_index(filename, category)
+        
+        if index is not None and not (year_range and index['years'] is None):
+            if not (scenario or variant or year_range):
+                return df
+            positions = self._select_positions(
+                index, [scenario] if scenario else None, variant, year_range
+            )
+            return df.iloc[positions]
         
         if scenario and 'scenario' in df.columns:
             df = df[df['scenario'] == scenario]
@@ -112,10 +336,165 @@ class CSVProcessor:
         """Compare specific variable across multiple scenarios."""
         df = self.load_csv(filename, category)
         
+        # Narrow to the scenario slices first so the variable mask runs on fewer rows
+        if scenarios and 'scenario' in df.columns:
+            df = df.iloc[self._select_positions(self._get_index(filename, category), scenarios)]
+        
         if 'variable' in df.columns:
             df = df[df['variable'] == variable]
+            
+        return df
+    
+    @staticmethod
+    def _get_dimension_column(df: pd.DataFrame) -> Optional[str]:
+        """Pick the column that describes what each row of a file measures."""
+        candidates = [c for c in df.columns if c not in FACT_COLUMNS]
+        labels = [c for c in candidates if c not in DIMENSION_CODE_COLUMNS]
+        if labels:
+            return labels[0]
+        return candidates[0] if candidates else None
+    
+    @staticmethod
+    def _get_dimension_code_column(df: pd.DataFrame, dimension: Optional[str]) -> Optional[str]:
+        """Pick the code column that accompanies the dimension label column, if any."""
+        codes = [c for c in df.columns if c in DIMENSION_CODE_COLUMNS and c != dimension]
+        return codes[0] if codes else None
+    
+    def _to_fact_rows(self, df: pd.DataFrame, dataset: str) -> pd.DataFrame:
+        """Reshape one file into the long fact table layout."""
+        dimension = self._get_dimension_column(df)
+        dimension_values = df[dimension].astype(object) if dimension else pd.Series(None, index=df.index)
         
-        if scenarios and 'scenario' in df.columns:
-            df = df[df['scenario'].isin(scenarios)]
+        # Labels repeat across codes (e.g. "Landwirtschaft" under CRF 1A4c
+        # and 3), so the code is kept in front of the label: "1A4c Landwirtschaft"
+        code_column = self._get_dimension_code_column(df, dimension)
+        if code_column:
+            codes = df[code_column]
+            dimension_values = dimension_values.where(
+                codes.isna(), codes.astype(str) + " " + dimension_values.astype(str)
+            )
+        years = pd.to_numeric(df['year'], errors='coerce') if 'year' in df.columns else None
+        
+        # Cost files use period labels such as "kumuliert 2020-50" instead of
+        # a year; keep the label on the dimension value so rows stay distinct
+        if years is not None and years.isna().any():
+            periods = years.isna() & df['year'].notna()
+            dimension_values = dimension_values.where(
+                ~periods, dimension_values.astype(str) + " (" + df['year'].astype(str) + ")"
+            )
+        
+        facts = pd.DataFrame({
+            'dataset': dataset,
+            'dimension_name': dimension,
+            'dimension_value': dimension_values,
+            'scenario': df['scenario'].astype(object) if 'scenario' in df.columns else None,
+            'variant': df['variant'].astype(object) if 'variant' in df.columns else None,
+            'year': years,
+            'unit': df['unit'].astype(object) if 'unit' in df.columns else None,
+            'value': df['value'] if 'value' in df.columns else None,
+        }, index=df.index)
+        
+        return facts[FACT_TABLE_COLUMNS]
+    
+    def build_fact_table(self, persist: bool = True) -> pd.DataFrame:
+        """Consolidate every extracted file into one categorical long-format table.
+        
+        Columns: dataset, dimension_name, dimension_value, scenario, variant,
+        year, unit, value. The dataset is "<category>/<filename>".
+        """
+        frames = []
+        files = self.get_available_files()
+        
+        for category, filenames in files.items():
+            for filename in sorted(filenames):
+                try:
+                    df = self.load_csv(filename, category)
+                    frames.append(self._to_fact_rows(df, f"{category}/{filename}"))
+                except Exception as e:
+                    print(f"Error adding {filename} to fact table: {e}")
+                    
+        if not frames:
+            return pd.DataFrame(columns=FACT_TABLE_COLUMNS)
+            
+        facts = pd.concat(frames, ignore_index=True)
+        for column in FACT_TABLE_COLUMNS:
+            if column not in NUMERIC_COLUMNS:
+                facts[column] = facts[column].astype("category")
+        
+        if persist:
+            try:
+                os.makedirs(self.cache_path, exist_ok=True)
+                facts.to_parquet(self.fact_table_path, index=False)
+            except Exception as e:
+                print(f"Error persisting fact table: {e}")
+                
+        self._fact_table = facts
+        return facts
+    
+    def _is_fact_table_fresh(self) -> bool:
+        """Check that the persisted fact table is newer than every source file."""
+        if not os.path.exists(self.fact_table_path):
+            return False
+            
+        built_at = os.path.getmtime(self.fact_table_path)
+        for category, filenames in self.get_available_files().items():
+            for filename in filenames:
+                if os.path.getmtime(self._get_file_path(filename, category)) > built_at:
+                    return False
+        return True
+    
+    def get_fact_table(self) -> pd.DataFrame:
+        """Return the consolidated fact table, loading or building it once."""
+        if self._fact_table is not None:
+            return self._fact_table
+            
+        with self._get_key_lock("fact_table"):
+            if self._fact_table is not None:
+                return self._fact_table
+            return self._load_fact_table()
+    
+    def _load_fact_table(self) -> pd.DataFrame:
+        if self._is_fact_table_fresh():
+            try:
+                self._fact_table = pd.read_parquet(self.fact_table_path)
+                return self._fact_table
+            except Exception as e:
+                print(f"Error reading fact table: {e}")
+                
+        return self.build_fact_table()
+    
+    def query_facts(self, keywords: Optional[List[str]] = None, datasets: Optional[List[str]] = None,
+                    dimension_values: Optional[List[str]] = None, scenarios: Optional[List[str]] = None,
+                    variants: Optional[List[str]] = None,
+                    year_range: Optional[Tuple[int, int]] = None) -> pd.DataFrame:
+        """Slice the fact table across all files with a single vectorized filter.
+        
+        Keywords are matched against dataset names the same way
+        search_data_by_keywords matches filenames.
+        """
+        facts = self.get_fact_table()
+        mask = pd.Series(True, index=facts.index)
+        
+        if keywords:
+            names = facts['dataset'].cat.categories
+            matching = [name for name in names
+                        if any(keyword.lower() in name.split('/')[-1].lower() for keyword in keywords)]
+            mask &= facts['dataset'].isin(matching)
+            
+        if datasets:
+            mask &= facts['dataset'].isin(datasets)
+            
+        if dimension_values:
+            mask &= facts['dimension_value'].isin(dimension_values)
+            
+        if scenarios:
+            mask &= facts['scenario'].isin(scenarios)
+            
+        if variants:
+            mask &= facts['variant'].isin(variants)
+            
+        if year_range:
+            start_year, end_year = year_range
+            mask &= (facts['year'] >= start_year) & (facts['year'] <= end_year)
             
-        return df
\ No newline at end of file
+        return facts[mask]
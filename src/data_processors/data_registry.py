@@ -0,0 +1,65 @@
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+from utils.config import config
+from data_processors.csv_processor import CSVProcessor
+from data_processors.pdf_processor import PDFProcessor
+from data_processors.memory_cache import MemoryBudgetCache
+
+def _megabytes_to_budget(megabytes: float) -> Optional[int]:
+    """Convert a configured size in MB to a byte budget; 0 means unbounded."""
+    return int(megabytes * 1024 * 1024) if megabytes and megabytes > 0 else None
+
+class DataRegistry:
+    """Process-wide data layer shared by all agents.
+
+    Holds one CSVProcessor and one PDFProcessor so every agent reads from the
+    same caches; the processors dedupe concurrent first loads of a file.
+    Cache budgets default to CSV_CACHE_MAX_MB / PDF_CACHE_MAX_MB.
+    """
+
+    def __init__(self, data_path: str, reports_path: Optional[str] = None,
+                 csv_cache_max_bytes: Optional[int] = None, pdf_cache_max_bytes: Optional[int] = None):
+        self.data_path = data_path
+        self.reports_path = reports_path or os.path.join(data_path, "reports")
+
+        if csv_cache_max_bytes is None:
+            csv_cache_max_bytes = _megabytes_to_budget(config.csv_cache_max_mb)
+        if pdf_cache_max_bytes is None:
+            pdf_cache_max_bytes = _megabytes_to_budget(config.pdf_cache_max_mb)
+
+        self.csv_processor = CSVProcessor(self.data_path, cache=MemoryBudgetCache(csv_cache_max_bytes))
+        self.pdf_processor = PDFProcessor(self.reports_path, cache=MemoryBudgetCache(pdf_cache_max_bytes))
+
+    def get_memory_footprint(self) -> Dict[str, int]:
+        """Report bytes held in memory by the shared processors."""
+        footprint = {}
+
+        for name, usage in self.csv_processor.get_memory_usage().items():
+            footprint[f"csv_{name}"] = usage
+        for name, usage in self.pdf_processor.get_memory_usage().items():
+            footprint[f"pdf_{name}"] = usage
+
+        footprint["total"] = sum(footprint.values())
+        return footprint
+
+    def get_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return hit/miss/eviction counters of the shared caches."""
+        return {
+            "csv": self.csv_processor.get_cache_stats(),
+            "pdf": self.pdf_processor.get_cache_stats()
+        }
+
+_registries: Dict[Tuple[str, str], DataRegistry] = {}
+_registries_lock = threading.Lock()
+
+def get_data_registry(data_path: str, reports_path: Optional[str] = None) -> DataRegistry:
+    """Return the shared registry for a data location, creating it once."""
+    data_path = os.path.abspath(data_path)
+    reports_path = os.path.abspath(reports_path or os.path.join(data_path, "reports"))
+
+    with _registries_lock:
+        key = (data_path, reports_path)
+        if key not in _registries:
+            _registries[key] = DataRegistry(data_path, reports_path)
+        return _registries[key]
@@ -0,0 +1,120 @@
+import threading
+from typing import Any, Dict, List, Optional
+import PyPDF2
+
+class PDFDocument:
+    """A PDF whose page text is extracted on first access and memoized.
+
+    Previews and lookups only extract the pages they need. The parsed file
+    is released once every page has been extracted, or by close(). Documents
+    created from already extracted pages never parse the file for their text.
+    """
+
+    def __init__(self, pdf_path: str, pages: Optional[List[str]] = None):
+        self.pdf_path = pdf_path
+        self._reader: Optional[PyPDF2.PdfReader] = None
+        self._pages: Dict[int, str] = dict(enumerate(pages)) if pages is not None else {}
+        self._num_pages = len(pages) if pages is not None else None
+        self.pages_extracted = 0
+        # PyPDF2 readers are not thread-safe
+        self._lock = threading.RLock()
+
+    @property
+    def reader(self) -> PyPDF2.PdfReader:
+        """The parsed file, opened on first use."""
+        with self._lock:
+            if self._reader is None:
+                self._reader = PyPDF2.PdfReader(self.pdf_path)
+            return self._reader
+
+    @property
+    def num_pages(self) -> int:
+        with self._lock:
+            if self._num_pages is None:
+                self._num_pages = len(self.reader.pages)
+            return self._num_pages
+
+    @property
+    def metadata(self) -> Any:
+        return self.reader.metadata
+
+    def get_metadata(self) -> Dict[str, str]:
+        """Return the document information as plain strings, e.g. {"Title": ..., "Author": ...}."""
+        with self._lock:
+            metadata = self.reader.metadata or {}
+            return {str(key).lstrip('/'): str(value) for key, value in metadata.items()}
+
+    def get_outline(self) -> List[Dict[str, Any]]:
+        """Return the bookmarks as a flat list of {"title", "page" (1-based or None), "level"}."""
+        with self._lock:
+            reader = self.reader
+            entries = []
+
+            def walk(items, level):
+                for item in items:
+                    if isinstance(item, list):
+                        walk(item, level + 1)
+                        continue
+                    try:
+                        # -1 means the destination does not resolve to a page
+                        page = reader.get_destination_page_number(item)
+                    except Exception:
+                        page = -1
+                    entries.append({"title": str(item.title), "page": page + 1 if page >= 0 else None,
+                                    "level": level})
+
+            try:
+                walk(reader.outline, 0)
+            except Exception as e:
+                print(f"Error reading outline of {self.pdf_path}: {e}")
+            return entries
+
+    def get_page(self, index: int) -> str:
+        """Return the text of a page (0-based), extracting it on first access."""
+        with self._lock:
+            text = self._pages.get(index)
+            if text is None:
+                reader = self.reader
+                if self._num_pages is None:
+                    self._num_pages = len(reader.pages)
+                text = reader.pages[index].extract_text() or ""
+                self._pages[index] = text
+                self.pages_extracted += 1
+                self._release_if_complete()
+            return text
+
+    def get_pages(self, start: int = 0, end: Optional[int] = None) -> List[str]:
+        """Return the text of pages [start, end)."""
+        end = self.num_pages if end is None else min(end, self.num_pages)
+        return [self.get_page(index) for index in range(start, end)]
+
+    def get_text(self) -> str:
+        """Return the whole document text, one newline after each page."""
+        return "".join(page + "\n" for page in self.get_pages())
+
+    def get_text_prefix(self, max_chars: int) -> str:
+        """Return the first max_chars characters, extracting only the pages they span."""
+        parts = []
+        length = 0
+        for index in range(self.num_pages):
+            if length >= max_chars:
+                break
+            page = self.get_page(index) + "\n"
+            parts.append(page)
+            length += len(page)
+        return "".join(parts)[:max_chars]
+
+    def close(self):
+        """Release the parsed file, keeping extracted pages; it is reopened if more are needed."""
+        with self._lock:
+            self._reader = None
+    
+    def _release_if_complete(self):
+        """Drop the parsed file once all pages are memoized; call with the lock held."""
+        if self._num_pages is not None and len(self._pages) == self._num_pages:
+            self._reader = None
+
+    def get_memory_usage(self) -> int:
+        """Estimate the bytes held by extracted text (the parsed file is not counted)."""
+        with self._lock:
+            return sum(len(text) for text in self._pages.values())
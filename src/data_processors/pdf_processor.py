@@ -1,12 +1,47 @@
 import PyPDF2
+import bisect
 import os
-from typing import List, Dict, Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, List, Dict, Optional, Tuple
 import re
+import threading
+import time
+from data_processors.memory_cache import MemoryBudgetCache, estimate_size
+from data_processors.pdf_document import PDFDocument
+from data_processors.pdf_text_cache import PDFTextCache
+from data_processors.text_index import TextIndex
+from utils.language_detection import detect_language
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[str]:
+    """Extract the text of pages [start, end) of a PDF; runs in a worker process."""
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [pdf_reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+# Characters of leading text kept in a manifest and used to guess the language
+MANIFEST_PREVIEW_CHARS = 500
+LANGUAGE_SAMPLE_CHARS = 3000
 
 class PDFProcessor:
-    def __init__(self, reports_path: str):
+    def __init__(self, reports_path: str, cache: Optional[MemoryBudgetCache] = None,
+                 text_cache_path: Optional[str] = None):
         self.reports_path = reports_path
-        self._cache = {}
+        # Any dict-like cache works; the default is an unbounded LRU cache
+        self._cache = cache if cache is not None else MemoryBudgetCache()
+        # Extracted page text persists across restarts, next to the CSV store
+        self.text_cache = PDFTextCache(
+            text_cache_path or os.path.join(os.path.dirname(os.path.abspath(reports_path)), "cache", "pdf_text")
+        )
+        self.search_index_path = os.path.join(
+            os.path.dirname(self.text_cache.cache_path),
+            f"search_index_{os.path.basename(os.path.normpath(reports_path))}.json"
+        )
+        self._search_index: Optional[TextIndex] = None
+        self._documents: Dict[str, PDFDocument] = {}
+        # Manifests by filename, with the hash of the file they describe
+        self._manifests: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
         
     def get_available_reports(self) -> List[str]:
         """Get list of available PDF reports."""
@@ -16,52 +51,292 @@ class PDFProcessor:
     
     def extract_text(self, pdf_filename: str) -> str:
         """Extract text from a PDF file."""
-        if pdf_filename in self._cache:
-            return self._cache[pdf_filename]
+        return self._load_document(pdf_filename)["text"]
+    
+    def extract_pages(self, pdf_filename: str) -> List[str]:
+        """Return the text of each page of a PDF file."""
+        document = self._load_document(pdf_filename)
+        text, offsets = document["text"], document["page_offsets"]
+        # Each page is followed by a newline in the document text
+        ends = offsets[1:] + [len(text)]
+        return [text[start:end - 1] for start, end in zip(offsets, ends)]
+    
+    def get_page_offsets(self, pdf_filename: str) -> List[int]:
+        """Return the character offset at which each page starts in extract_text()."""
+        return self._load_document(pdf_filename)["page_offsets"]
+    
+    def get_page_number(self, pdf_filename: str, offset: int) -> int:
+        """Return the 1-based page containing a character offset of extract_text()."""
+        return max(1, bisect.bisect_right(self.get_page_offsets(pdf_filename), offset))
+    
+    def _load_document(self, pdf_filename: str) -> Dict[str, Any]:
+        """Return {"text", "page_offsets"} from memory, the on-disk text cache or PyPDF2."""
+        document = self._cache.get(pdf_filename)
+        if document is not None:
+            return document
             
-        pdf_path = os.path.join(self.reports_path, pdf_filename)
+        with self._get_key_lock(pdf_filename):
+            # Another thread may have extracted the document while we waited
+            if pdf_filename in self._cache:
+                document = self._cache.get(pdf_filename)
+                if document is not None:
+                    return document
+                
+            pdf_path = os.path.join(self.reports_path, pdf_filename)
+            
+            if not os.path.exists(pdf_path):
+                raise FileNotFoundError(f"PDF file {pdf_filename} not found")
+            
+            file_hash = self.text_cache.hash_file(pdf_path)
+            entry = self.text_cache.get(file_hash)
+            if entry is None:
+                try:
+                    # Reuses pages a preview already extracted
+                    pages = self.open_document(pdf_filename).get_pages()
+                except Exception as e:
+                    print(f"Error reading PDF {pdf_filename}: {e}")
+                    return {"text": "", "page_offsets": []}
+                entry = self.text_cache.put(file_hash, pdf_filename, pages)
+                
+            document = {
+                "text": "".join(page + "\n" for page in entry["pages"]),
+                "page_offsets": entry["page_offsets"]
+            }
+            self._cache[pdf_filename] = document
+            # The full text supersedes the lazily extracted pages
+            with self._lock:
+                self._documents.pop(pdf_filename, None)
+            return document
+    
+    def open_document(self, pdf_filename: str) -> PDFDocument:
+        """Return the lazily extracted document for a PDF file.
         
+        Documents in the text cache come with all their pages and are not
+        kept, since their full text belongs in the budgeted cache; others
+        extract pages from the file as they are accessed.
+        """
+        with self._lock:
+            document = self._documents.get(pdf_filename)
+        if document is not None:
+            return document
+            
+        pdf_path = os.path.join(self.reports_path, pdf_filename)
         if not os.path.exists(pdf_path):
             raise FileNotFoundError(f"PDF file {pdf_filename} not found")
+            
+        entry = self.text_cache.get(self.text_cache.hash_file(pdf_path))
+        if entry is not None:
+            return PDFDocument(pdf_path, pages=entry["pages"])
+        with self._lock:
+            return self._documents.setdefault(pdf_filename, PDFDocument(pdf_path))
+    
+    def get_text_preview(self, pdf_filename: str, max_chars: int) -> str:
+        """Return the first max_chars characters of a PDF, extracting only the pages needed.
+        
+        Previews are kept in the budgeted cache on their own, so previewing
+        every report does not hold their full text.
+        """
+        document = self._cache.get(pdf_filename)
+        if document is not None:
+            return document["text"][:max_chars]
+        
+        preview_key = f"preview:{max_chars}:{pdf_filename}"
+        preview = self._cache.get(preview_key)
+        if preview is not None:
+            return preview
         
-        text = ""
+        document = self.open_document(pdf_filename)
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-        except Exception as e:
-            print(f"Error reading PDF {pdf_filename}: {e}")
-            return ""
-            
-        self._cache[pdf_filename] = text
-        return text
+            preview = document.get_text_prefix(max_chars)
+        finally:
+            # Keep the extracted pages but not the parsed file
+            document.close()
+        self._cache[preview_key] = preview
+        return preview
     
-    def search_text(self, query: str, pdf_filename: Optional[str] = None) -> Dict[str, List[str]]:
-        """Search for text across PDFs."""
-        results = {}
+    def ingest(self, filenames: Optional[List[str]] = None, max_workers: Optional[int] = None,
+               pages_per_shard: int = 25, force: bool = False) -> Dict[str, Any]:
+        """Extract many PDFs in parallel worker processes into the text cache.
         
-        files_to_search = [pdf_filename] if pdf_filename else self.get_available_reports()
+        Each document is split into shards of pages_per_shard pages. The
+        shards run across a ProcessPoolExecutor, and their pages are merged
+        back in order. Documents already in the text cache are skipped
+        unless force is set.
+        """
+        start_time = time.perf_counter()
+        filenames = filenames if filenames is not None else self.get_available_reports()
+        documents = {}
+        shards = []
+        skipped = 0
+        errors = {}
         
-        for filename in files_to_search:
+        for filename in filenames:
+            pdf_path = os.path.join(self.reports_path, filename)
             try:
-                text = self.extract_text(filename)
-                # Split text into paragraphs and search
-                paragraphs = text.split('\n\n')
-                matches = []
-                
-                for paragraph in paragraphs:
-                    if re.search(query, paragraph, re.IGNORECASE):
-                        matches.append(paragraph.strip())
-                
-                if matches:
-                    results[filename] = matches
-                    
+                file_hash = self.text_cache.hash_file(pdf_path)
+                if not force and self.text_cache.contains(file_hash):
+                    skipped += 1
+                    continue
+                with open(pdf_path, 'rb') as file:
+                    num_pages = len(PyPDF2.PdfReader(file).pages)
             except Exception as e:
-                print(f"Error searching in {filename}: {e}")
+                print(f"Error reading PDF {filename}: {e}")
+                errors[filename] = str(e)
+                continue
+                
+            documents[filename] = (file_hash, [""] * num_pages)
+            for start in range(0, num_pages, pages_per_shard):
+                shards.append((filename, pdf_path, start, min(start + pages_per_shard, num_pages)))
+        
+        if shards:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(_extract_page_range, pdf_path, start, end): (filename, start)
+                    for filename, pdf_path, start, end in shards
+                }
+                for future in as_completed(futures):
+                    filename, start = futures[future]
+                    try:
+                        pages = future.result()
+                    except Exception as e:
+                        print(f"Error extracting pages of {filename} from page {start + 1}: {e}")
+                        errors[filename] = str(e)
+                        continue
+                    documents[filename][1][start:start + len(pages)] = pages
+        
+        page_count = 0
+        for filename, (file_hash, pages) in documents.items():
+            if filename in errors:
+                continue
+            self.text_cache.put(file_hash, filename, pages)
+            # Drop stale text so the next load reads the new entry
+            self._cache.pop(filename, None)
+            with self._lock:
+                self._documents.pop(filename, None)
+            page_count += len(pages)
+        
+        seconds = time.perf_counter() - start_time
+        return {
+            "documents": sum(1 for filename in documents if filename not in errors),
+            "skipped": skipped,
+            "shards": len(shards),
+            "pages": page_count,
+            "seconds": seconds,
+            "pages_per_second": page_count / seconds if seconds > 0 else 0.0,
+            "errors": errors
+        }
+    
+    def _get_key_lock(self, key: str) -> threading.Lock:
+        """Return the lock serializing the first extraction of a document."""
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+    
+    def get_memory_usage(self) -> Dict[str, int]:
+        """Report the bytes held by extracted document text."""
+        with self._lock:
+            documents = list(self._documents.values())
+        return {
+            "text": sum(estimate_size(document) for document in list(self._cache.values())),
+            "pages": sum(document.get_memory_usage() for document in documents)
+        }
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters of the text cache."""
+        get_stats = getattr(self._cache, "get_stats", None)
+        stats = get_stats() if get_stats else {"entries": len(self._cache)}
+        return {**stats, "disk": self.text_cache.get_stats()}
+    
+    def get_search_index(self) -> TextIndex:
+        """Return the full-text index over all reports, rebuilt when a report is added or changed."""
+        current = {
+            filename: self.text_cache.hash_file(os.path.join(self.reports_path, filename))
+            for filename in self.get_available_reports()
+        }
+        index = self._search_index
+        if index is not None and index.documents == current:
+            return index
+        
+        with self._get_key_lock("search_index"):
+            index = self._search_index
+            if index is None or index.documents != current:
+                index = TextIndex.load(self.search_index_path)
+                if index is None or index.documents != current:
+                    index = TextIndex.build({
+                        filename: (file_hash, self.extract_pages(filename))
+                        for filename, file_hash in current.items()
+                    })
+                    index.save(self.search_index_path)
+                self._search_index = index
+            return index
+    
+    def search(self, query: str, top_k: int = 10,
+               pdf_filenames: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Return the BM25 top_k passages for a query with their document and page, best first."""
+        return self.get_search_index().search(query, top_k, pdf_filenames)
+    
+    def search_text(self, query: str, pdf_filename: Optional[str] = None, top_k: int = 10) -> Dict[str, List[str]]:
+        """Search for text across PDFs.
+        
+        The query is matched as words, not as a regular expression; the
+        best passages are returned per document, best first.
+        """
+        results = {}
+        
+        try:
+            hits = self.search(query, top_k, [pdf_filename] if pdf_filename else None)
+        except Exception as e:
+            print(f"Error searching reports: {e}")
+            return results
+            
+        for hit in hits:
+            results.setdefault(hit["filename"], []).append(hit["text"])
                 
         return results
     
+    def get_manifest(self, pdf_filename: str) -> Dict[str, Any]:
+        """Return page count, metadata, outline, language guess and preview of a PDF.
+        
+        Manifests are built with a single parse of the file and persisted
+        next to the extracted text, so later runs do not open the PDF. The
+        file's hash is checked on every call (a stat while its size and mtime
+        are unchanged), so a replaced file gets a new manifest.
+        """
+        pdf_path = os.path.join(self.reports_path, pdf_filename)
+        if not os.path.exists(pdf_path):
+            raise FileNotFoundError(f"PDF file {pdf_filename} not found")
+            
+        file_hash = self.text_cache.hash_file(pdf_path)
+        with self._lock:
+            known = self._manifests.get(pdf_filename)
+        if known is not None and known[0] == file_hash:
+            return known[1]
+            
+        with self._get_key_lock(f"manifest:{pdf_filename}"):
+            manifest = self.text_cache.get_manifest(file_hash)
+            if manifest is None:
+                manifest = self._build_manifest(pdf_filename)
+                self.text_cache.put_manifest(file_hash, manifest)
+            with self._lock:
+                self._manifests[pdf_filename] = (file_hash, manifest)
+            return manifest
+    
+    def _build_manifest(self, pdf_filename: str) -> Dict[str, Any]:
+        document = self.open_document(pdf_filename)
+        try:
+            sample = document.get_text_prefix(LANGUAGE_SAMPLE_CHARS)
+            language, confidence = detect_language(sample)
+            return {
+                "num_pages": document.num_pages,
+                "metadata": document.get_metadata(),
+                "outline": document.get_outline(),
+                "language": language,
+                "language_confidence": confidence,
+                "text_preview": sample[:MANIFEST_PREVIEW_CHARS]
+            }
+        finally:
+            # The manifest is all later calls need from the parsed file
+            document.close()
+    
     def get_document_summary(self, pdf_filename: str) -> Dict[str, any]:
         """Get summary information about a PDF document."""
         pdf_path = os.path.join(self.reports_path, pdf_filename)
@@ -70,17 +345,15 @@ class PDFProcessor:
             raise FileNotFoundError(f"PDF file {pdf_filename} not found")
         
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                summary = {
-                    "filename": pdf_filename,
-                    "num_pages": len(pdf_reader.pages),
-                    "metadata": pdf_reader.metadata if hasattr(pdf_reader, 'metadata') else {},
-                    "text_preview": self.extract_text(pdf_filename)[:500] + "..."
-                }
-                
-                return summary
+            manifest = self.get_manifest(pdf_filename)
+            
+            summary = {
+                "filename": pdf_filename,
+                **manifest,
+                "text_preview": manifest["text_preview"] + "..."
+            }
+            
+            return summary
                 
         except Exception as e:
             return {"error": f"Could not process PDF: {e}"}
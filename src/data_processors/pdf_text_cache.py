@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+def compute_page_offsets(pages: List[str]) -> List[int]:
+    """Start offset of each page in the document text (pages joined with a trailing newline each)."""
+    offsets = []
+    position = 0
+    for page in pages:
+        offsets.append(position)
+        position += len(page) + 1
+    return offsets
+
+class PDFTextCache:
+    """On-disk store of text extracted from PDFs, one JSON file per document.
+
+    Entries are keyed by the SHA-256 of the PDF's bytes, so renamed files
+    still hit and changed files miss. Each entry holds the text of every
+    page and the character offset where each page starts in the joined
+    document text. A document manifest (page count, metadata, outline,
+    language, preview) is stored beside it. Known file hashes are
+    persisted too, so unchanged files are not read again after a restart.
+    """
+
+    def __init__(self, cache_path: str):
+        self.cache_path = cache_path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._hashes_path = os.path.join(cache_path, "file_hashes.json")
+        self._file_hashes: Dict[str, list] = self._read_json(self._hashes_path) or {}
+
+    def hash_file(self, pdf_path: str) -> str:
+        """Return the SHA-256 of a file; rehashed only when its size or mtime changes."""
+        pdf_path = os.path.abspath(pdf_path)
+        stat = os.stat(pdf_path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+
+        with self._lock:
+            known = self._file_hashes.get(pdf_path)
+        if known is not None and known[0] == signature:
+            return known[1]
+
+        digest = hashlib.sha256()
+        with open(pdf_path, 'rb') as file:
+            for block in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(block)
+        file_hash = digest.hexdigest()
+
+        with self._lock:
+            self._file_hashes[pdf_path] = [signature, file_hash]
+            file_hashes = dict(self._file_hashes)
+        self._write_json(self._hashes_path, file_hashes)
+        return file_hash
+
+    def _get_entry_path(self, file_hash: str) -> str:
+        return os.path.join(self.cache_path, f"{file_hash}.json")
+
+    def _get_manifest_path(self, file_hash: str) -> str:
+        return os.path.join(self.cache_path, f"{file_hash}.manifest.json")
+
+    def contains(self, file_hash: str) -> bool:
+        return os.path.exists(self._get_entry_path(file_hash))
+
+    def get(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Return {"filename", "pages", "page_offsets"} for a document, or None if not cached."""
+        entry = self._read_json(self._get_entry_path(file_hash))
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry
+
+    def put(self, file_hash: str, filename: str, pages: List[str]) -> Dict[str, Any]:
+        """Store the pages of a document and return the entry."""
+        entry = {"filename": filename, "pages": pages, "page_offsets": compute_page_offsets(pages)}
+        self._write_json(self._get_entry_path(file_hash), entry)
+        return entry
+
+    def get_manifest(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the stored manifest of a document, or None."""
+        return self._read_json(self._get_manifest_path(file_hash))
+
+    def put_manifest(self, file_hash: str, manifest: Dict[str, Any]):
+        self._write_json(self._get_manifest_path(file_hash), manifest)
+
+    @staticmethod
+    def _read_json(path: str) -> Optional[Any]:
+        try:
+            with open(path, encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Error reading {path}: {e}")
+            return None
+
+    def _write_json(self, path: str, data: Any):
+        try:
+            os.makedirs(self.cache_path, exist_ok=True)
+            # Write to a temporary file first so readers never see a partial file
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error writing {path}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        names = os.listdir(self.cache_path) if os.path.isdir(self.cache_path) else []
+        manifests = sum(1 for name in names if name.endswith('.manifest.json'))
+        entries = sum(1 for name in names if name.endswith('.json')) - manifests - ("file_hashes.json" in names)
+        return {"entries": entries, "manifests": manifests, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,184 @@
+import heapq
+import json
+import math
+import os
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Bump when tokenization or the stored format changes, so old indexes are rebuilt
+INDEX_VERSION = 1
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Target chunk size in characters; chunks end at line breaks
+CHUNK_CHARS = 700
+
+# Function words of the report and query languages, after accent folding
+STOPWORDS = {
+    # English
+    "the", "and", "or", "of", "to", "in", "on", "for", "by", "with", "from", "at", "as", "is", "are",
+    "was", "were", "be", "been", "it", "its", "this", "that", "these", "those", "an", "what", "which",
+    "how", "does", "do", "about", "under", "between", "into", "than", "not", "no", "can", "will",
+    # German
+    "der", "die", "das", "den", "dem", "des", "ein", "eine", "einer", "eines", "einem", "einen", "und",
+    "oder", "zu", "zum", "zur", "im", "in", "auf", "fur", "mit", "von", "vom", "bei", "aus", "ist", "sind",
+    "wird", "werden", "wurde", "wurden", "als", "auch", "sich", "nicht", "es", "wie", "bis", "nach",
+    "uber", "unter", "durch", "dass", "sowie", "noch", "nur", "so", "sie", "er", "wir",
+    # French
+    "le", "la", "les", "un", "une", "des", "du", "de", "et", "ou", "au", "aux", "en", "dans", "par",
+    "pour", "sur", "avec", "est", "sont", "que", "qui", "quel", "quelle", "quels", "quelles", "ce",
+    "cette", "ces", "il", "elle", "ils", "elles", "pas", "plus", "se", "sa", "son", "ses", "leur", "leurs",
+}
+
+# Inflection suffixes of German, French and English, longest first
+SUFFIXES = sorted({
+    # English
+    "ations", "ation", "ings", "ing", "ness", "ments", "ment", "ies", "ied", "ed", "es", "s", "ly",
+    # German
+    "ungen", "ung", "heiten", "heit", "keiten", "keit", "lichen", "liche", "lich", "ischen", "ische",
+    "isch", "ern", "en", "er", "em", "e", "n",
+    # French
+    "ements", "ement", "euses", "euse", "eux", "ites", "ite", "ives", "ive", "aux",
+}, key=len, reverse=True)
+
+MIN_STEM_LENGTH = 4
+
+WORD_PATTERN = re.compile(r"[^\W_]+")
+HYPHENATION_PATTERN = re.compile(r"(\w)-\s*\n\s*(\w)")
+
+def _fold(text: str) -> str:
+    """Lowercase and strip accents, so "Wärme" matches "warme" and "énergie" matches "energie"."""
+    text = unicodedata.normalize("NFKD", text.lower().replace("ß", "ss"))
+    return "".join(character for character in text if not unicodedata.combining(character))
+
+def stem(word: str) -> str:
+    """Strip one inflection suffix, keeping at least MIN_STEM_LENGTH characters."""
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            return word[:-len(suffix)]
+    return word
+
+def tokenize(text: str) -> List[str]:
+    """Split German, French or English text into folded, stemmed terms without stopwords."""
+    # Rejoin words hyphenated across line breaks by the PDF layout
+    text = HYPHENATION_PATTERN.sub(r"\1\2", text)
+    return [stem(word) for word in WORD_PATTERN.findall(_fold(text))
+            if len(word) > 1 and word not in STOPWORDS]
+
+def split_chunks(page_text: str) -> List[str]:
+    """Split a page into chunks of about CHUNK_CHARS characters at line breaks."""
+    chunks = []
+    lines = []
+    size = 0
+    for line in page_text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        lines.append(line)
+        size += len(line) + 1
+        if size >= CHUNK_CHARS:
+            chunks.append("\n".join(lines))
+            lines, size = [], 0
+    if lines:
+        chunks.append("\n".join(lines))
+    return chunks
+
+class TextIndex:
+    """Inverted index over page chunks of documents with BM25 ranking.
+
+    Each chunk remembers its document and page. Postings store the BM25
+    weight of each term in each chunk, precomputed at build time, so a
+    search only adds up the weights from the posting lists of the query
+    terms.
+    """
+
+    def __init__(self):
+        self.documents: Dict[str, str] = {}  # filename -> file hash
+        self.chunks: List[Tuple[str, int, str]] = []  # (filename, page number, text)
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+
+    @classmethod
+    def build(cls, documents: Dict[str, Tuple[str, Sequence[str]]]) -> "TextIndex":
+        """Index {filename: (file hash, page texts)}."""
+        index = cls()
+        term_counts = []
+
+        for filename, (file_hash, pages) in documents.items():
+            index.documents[filename] = file_hash
+            for page_number, page_text in enumerate(pages, start=1):
+                for chunk in split_chunks(page_text):
+                    index.chunks.append((filename, page_number, chunk))
+                    term_counts.append(Counter(tokenize(chunk)))
+
+        lengths = [sum(counts.values()) for counts in term_counts]
+        average_length = sum(lengths) / len(lengths) if lengths else 0.0
+        document_frequency = Counter(term for counts in term_counts for term in counts)
+        total = len(term_counts)
+
+        postings = defaultdict(list)
+        for chunk_id, counts in enumerate(term_counts):
+            normalization = K1 * (1 - B + B * lengths[chunk_id] / average_length) if average_length else K1
+            for term, frequency in counts.items():
+                idf = math.log(1 + (total - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+                weight = idf * frequency * (K1 + 1) / (frequency + normalization)
+                postings[term].append((chunk_id, round(weight, 4)))
+
+        index.postings = dict(postings)
+        return index
+
+    def search(self, query: str, top_k: int = 10,
+               filenames: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Return the top_k chunks for a query, best first, optionally within some documents."""
+        allowed = set(filenames) if filenames is not None else None
+        scores: Dict[int, float] = defaultdict(float)
+
+        for term in set(tokenize(query)):
+            for chunk_id, weight in self.postings.get(term, ()):
+                scores[chunk_id] += weight
+
+        if allowed is not None:
+            scores = {chunk_id: score for chunk_id, score in scores.items() if self.chunks[chunk_id][0] in allowed}
+
+        results = []
+        for chunk_id, score in heapq.nlargest(top_k, scores.items(), key=lambda item: item[1]):
+            filename, page, text = self.chunks[chunk_id]
+            results.append({"filename": filename, "page": page, "score": score, "text": text})
+        return results
+
+    def save(self, path: str):
+        """Persist the index as JSON."""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump({"version": INDEX_VERSION, "documents": self.documents,
+                           "chunks": self.chunks, "postings": self.postings}, file, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error saving search index: {e}")
+
+    @classmethod
+    def load(cls, path: str) -> Optional["TextIndex"]:
+        """Load a persisted index, or None if it is missing or from another version."""
+        try:
+            with open(path, encoding='utf-8') as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Error loading search index: {e}")
+            return None
+
+        if data.get("version") != INDEX_VERSION:
+            return None
+
+        index = cls()
+        index.documents = data["documents"]
+        # JSON turns the tuples into lists, which unpack the same way
+        index.chunks = data["chunks"]
+        index.postings = data["postings"]
+        return index
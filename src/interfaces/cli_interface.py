@@ -8,28 +8,36 @@ import json
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from utils.config import config
+from agents.base_agent import AgentResponse
 from agents.orchestrator_agent import OrchestratorAgent
 from agents.data_interpreter_agent import DataInterpreterAgent
 from agents.scenario_analyst_agent import ScenarioAnalystAgent
 from agents.document_intelligence_agent import DocumentIntelligenceAgent
 from agents.policy_context_agent import PolicyContextAgent
+from data_processors.data_registry import get_data_registry
 
 class EnergyScenariosCLI:
     def __init__(self):
         config.validate()
         
+        # Shared data layer for all agents
+        self.data_registry = get_data_registry(config.data_path, config.reports_path)
+        
         # Initialize agents
         self.data_interpreter = DataInterpreterAgent(
             config.openai_api_key, 
-            config.data_path
+            config.data_path,
+            self.data_registry
         )
         self.scenario_analyst = ScenarioAnalystAgent(
             config.openai_api_key, 
-            config.data_path
+            config.data_path,
+            self.data_registry
         )
         self.document_intelligence = DocumentIntelligenceAgent(
             config.openai_api_key, 
-            config.reports_path
+            config.reports_path,
+            self.data_registry
         )
         self.policy_context = PolicyContextAgent(
             config.openai_api_key
@@ -68,6 +76,7 @@ class EnergyScenariosCLI:
         print("- 'help' - Show detailed help")
         print("- 'agents' - List available agents")
         print("- 'history' - Show conversation history")
+        print("- 'stats' - Show routing and LLM request statistics")
         print("- 'clear' - Clear conversation history")
         print("- 'quit' or 'exit' - Exit the system")
         print("=" * 80)
@@ -152,6 +161,29 @@ USER TYPES - Adapt your questions:
             print(f"   Confidence: {entry['response']['confidence']:.2f}")
             print()
             
+    def display_stats(self):
+        """Display routing and LLM request scheduling statistics."""
+        stats = self.orchestrator.get_routing_stats()
+        
+        print("\n🧭 ROUTING STATISTICS:")
+        print("-" * 50)
+        print(f"Queries routed: {stats['queries']}")
+        print(f"Routed locally: {stats['resolved_locally']} ({stats['local_fraction']:.0%})")
+        print(f"Sent to LLM router: {stats['escalated']}")
+        print(f"Average local routing time: {stats['average_local_ms']:.2f} ms")
+        if stats['average_llm_ms'] is not None:
+            print(f"Average LLM routing time: {stats['average_llm_ms']:.0f} ms")
+            print(f"Estimated time saved: {stats['estimated_seconds_saved']:.1f} s")
+        
+        print("\n📡 LLM REQUESTS:")
+        print("-" * 50)
+        for model, model_stats in self.orchestrator.scheduler.get_stats().items():
+            print(f"{model}: {model_stats['requests']} requests, {model_stats['active']} active, "
+                  f"{model_stats['queue_depth']} queued, limit {model_stats['concurrency_limit']}/{model_stats['max_concurrency']}")
+            print(f"   Wait: {model_stats['average_wait_ms']:.0f} ms average, {model_stats['max_wait_ms']:.0f} ms max, "
+                  f"{model_stats['rate_limited']} rate limited")
+        print()
+            
     async def process_query(self, query: str, user_type: str = "citizen") -> None:
         """Process a user query."""
         print(f"\n🔄 Processing your query...")
@@ -162,11 +194,20 @@ USER TYPES - Adapt your questions:
             # Add user context
             context = {"user_type": user_type}
             
-            # Process with orchestrator
-            response = await self.orchestrator.process_query(query, context)
+            # Stream the answer as the orchestrator produces it
+            print("✅ RESPONSE:")
+            print("-" * 50)
+            
+            response = None
+            async for chunk in self.orchestrator.stream_query(query, context):
+                if isinstance(chunk, AgentResponse):
+                    response = chunk
+                else:
+                    print(chunk, end="", flush=True)
+            print("\n")
             
-            # Display response
-            self._display_response(response)
+            # Display confidence, sources and suggestions
+            self._display_response_details(response)
             
             # Store in history
             self.conversation_history.append({
@@ -191,6 +232,10 @@ USER TYPES - Adapt your questions:
         print(response.content)
         print()
         
+        self._display_response_details(response)
+        
+    def _display_response_details(self, response) -> None:
+        """Display confidence, reasoning, sources and suggestions of a response."""
         # Show confidence and reasoning
         confidence_emoji = "🟢" if response.confidence > 0.7 else "🟡" if response.confidence > 0.4 else "🔴"
         print(f"{confidence_emoji} Confidence: {response.confidence:.2f}")
@@ -268,6 +313,9 @@ USER TYPES - Adapt your questions:
                 elif query.lower() == 'history':
                     self.display_history()
                     continue
+                elif query.lower() == 'stats':
+                    self.display_stats()
+                    continue
                 elif query.lower() == 'clear':
                     self.conversation_history = []
                     print("🗑️  Conversation history cleared.")
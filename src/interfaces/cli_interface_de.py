@@ -13,23 +13,30 @@ from agents.data_interpreter_agent import DataInterpreterAgent
 from agents.scenario_analyst_agent import ScenarioAnalystAgent
 from agents.document_intelligence_agent import DocumentIntelligenceAgent
 from agents.policy_context_agent import PolicyContextAgent
+from data_processors.data_registry import get_data_registry
 
 class EnergieSzenarienCLI:
     def __init__(self):
         config.validate()
         
+        # Gemeinsame Datenschicht für alle Agenten
+        self.data_registry = get_data_registry(config.data_path, config.reports_path)
+        
         # Agenten initialisieren
         self.data_interpreter = DataInterpreterAgent(
             config.openai_api_key, 
-            config.data_path
+            config.data_path,
+            self.data_registry
         )
         self.scenario_analyst = ScenarioAnalystAgent(
             config.openai_api_key, 
-            config.data_path
+            config.data_path,
+            self.data_registry
         )
         self.document_intelligence = DocumentIntelligenceAgent(
             config.openai_api_key, 
-            config.reports_path
+            config.reports_path,
+            self.data_registry
         )
         self.policy_context = PolicyContextAgent(
             config.openai_api_key
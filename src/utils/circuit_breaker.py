@@ -0,0 +1,89 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+from utils.config import config
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend that is known to be unhealthy."""
+    pass
+
+class CircuitBreaker:
+    """Fails fast while a backend keeps failing.
+
+    After failure_threshold consecutive failures the circuit opens and
+    requests are rejected for reset_timeout seconds. Then a single trial
+    request is let through: success closes the circuit, failure opens it
+    again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self.rejected = 0
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_request(self) -> bool:
+        """Raise CircuitOpenError unless a request may be sent now; True if it is the half-open trial."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return False
+            if state == "half-open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+
+            self.rejected += 1
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(f"{self.name} is unavailable, retrying in {retry_in:.0f}s")
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def release_trial(self):
+        """Give up a half-open trial without a verdict, e.g. when the caller cancelled it."""
+        with self._lock:
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.trial_in_flight or self.consecutive_failures >= self.failure_threshold:
+                if self.opened_at is None or self.trial_in_flight:
+                    self.times_opened += 1
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.consecutive_failures,
+                    "times_opened": self.times_opened, "rejected": self.rejected}
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Return the shared circuit breaker for a backend, creating it once."""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=config.llm_circuit_failure_threshold,
+                reset_timeout=config.llm_circuit_reset_seconds
+            )
+        return _breakers[name]
@@ -13,20 +13,73 @@ class Config:
     model_name: str = "gpt-4"
     temperature: float = 0.3
     max_tokens: int = 2000
+    csv_cache_max_mb: float = 0  # 0 = unbounded
+    pdf_cache_max_mb: float = 0
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = ""
+    llm_cache_ttl_hours: float = 168
+    llm_cache_max_entries: int = 5000
+    translation_memory_path: str = ""
+    agent_timeout_seconds: float = 30  # 0 = no limit
+    query_timeout_seconds: float = 60
+    llm_max_concurrency: int = 8
+    llm_requests_per_minute: float = 0  # 0 = unlimited
+    llm_model_limits: str = ""
+    llm_max_retries: int = 3
+    llm_retry_base_delay: float = 0.5
+    llm_retry_max_delay: float = 8.0
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_reset_seconds: float = 30
+    llm_request_timeout_seconds: float = 20
+    llm_backend: str = "openai"  # "openai" or "fake"
+    fake_llm_latency: float = 0.5
+    prompt_context_max_tokens: int = 500
     
     @classmethod
     def from_env(cls) -> 'Config':
+        llm_backend = os.getenv("LLM_BACKEND", "openai").lower()
+        # Canned and echoed answers of the fake backend go to their own cache files
+        cache_suffix = "_fake" if llm_backend == "fake" else ""
+        
         return cls(
             openai_api_key=os.getenv("OPENAI_API_KEY"),
             data_path=os.path.join(os.path.dirname(__file__), "../../data"),
             reports_path=os.path.join(os.path.dirname(__file__), "../../data/reports"),
             model_name=os.getenv("MODEL_NAME", "gpt-4"),
             temperature=float(os.getenv("TEMPERATURE", "0.3")),
-            max_tokens=int(os.getenv("MAX_TOKENS", "2000"))
+            max_tokens=int(os.getenv("MAX_TOKENS", "2000")),
+            csv_cache_max_mb=float(os.getenv("CSV_CACHE_MAX_MB", "0")),
+            pdf_cache_max_mb=float(os.getenv("PDF_CACHE_MAX_MB", "0")),
+            llm_cache_enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+            llm_cache_path=os.getenv(
+                "LLM_CACHE_PATH",
+                os.path.join(os.path.dirname(__file__), f"../../data/cache/llm_responses{cache_suffix}.sqlite")
+            ),
+            llm_cache_ttl_hours=float(os.getenv("LLM_CACHE_TTL_HOURS", "168")),
+            llm_cache_max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000")),
+            translation_memory_path=os.getenv(
+                "TRANSLATION_MEMORY_PATH",
+                os.path.join(os.path.dirname(__file__), f"../../data/cache/translation_memory{cache_suffix}.sqlite")
+            ),
+            agent_timeout_seconds=float(os.getenv("AGENT_TIMEOUT_SECONDS", "30")),
+            query_timeout_seconds=float(os.getenv("QUERY_TIMEOUT_SECONDS", "60")),
+            llm_max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            llm_requests_per_minute=float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0")),
+            llm_model_limits=os.getenv("LLM_MODEL_LIMITS", ""),
+            llm_max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+            llm_retry_base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5")),
+            llm_retry_max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", "8")),
+            llm_circuit_failure_threshold=int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5")),
+            llm_circuit_reset_seconds=float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "30")),
+            llm_request_timeout_seconds=float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", "20")),
+            llm_backend=llm_backend,
+            fake_llm_latency=float(os.getenv("FAKE_LLM_LATENCY", "0.5")),
+            prompt_context_max_tokens=int(os.getenv("PROMPT_CONTEXT_MAX_TOKENS", "500"))
         )
         
     def validate(self) -> bool:
-        if not self.openai_api_key:
+        # The fake backend answers in-process and needs no key
+        if not self.openai_api_key and self.llm_backend != "fake":
             raise ValueError("OPENAI_API_KEY not found in environment variables")
         return True
 
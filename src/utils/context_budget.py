@@ -0,0 +1,107 @@
+import math
+from dataclasses import dataclass
+from typing import Any, List, Sequence
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the token count of a text (about four characters per token)."""
+    return math.ceil(len(text) / 4)
+
+def format_value(value: Any) -> str:
+    """Render a cell compactly: large numbers without decimals, small ones with 3 significant digits."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "-"
+    if isinstance(value, float):
+        if abs(value) >= 1000:
+            return f"{value:,.0f}"
+        return f"{value:.3g}"
+    if isinstance(value, (list, tuple)):
+        return ", ".join(format_value(item) for item in value)
+    return str(value)
+
+# Tokens reserved per section for its "(+N more rows)" note
+NOTE_TOKENS = 6
+
+@dataclass
+class _Section:
+    title: str
+    header: List[str]
+    rows: List[str]
+    priority: float
+    included: int = 0
+
+    @property
+    def minimum_cost(self) -> int:
+        """Tokens needed to show the title, header and first row."""
+        return estimate_tokens("\n".join([f"## {self.title}", *self.header, self.rows[0]])) + NOTE_TOKENS
+
+class ContextBuilder:
+    """Assembles structured evidence for a prompt within a token budget.
+
+    Evidence is added as sections of text lines or compact pipe-separated
+    tables. build() admits sections by priority while their header and first
+    row fit, then fills the remaining budget one row at a time from each
+    admitted section in turn, so every section gets its most important rows
+    before any section gets its tail. What does not fit is summarized as
+    "(+N more rows)" and "(N more sections omitted)".
+    """
+
+    def __init__(self, max_tokens: int):
+        self.max_tokens = max_tokens
+        self.sections: List[_Section] = []
+        self.omitted_sections = 0  # Callers add sections they skipped once is_full()
+        self._minimum_total = 0
+
+    def add_text(self, title: str, lines: Sequence[str], priority: float = 0.0):
+        """Add lines of text, most important first."""
+        self._add(_Section(title, [], [line for line in lines if line], priority))
+
+    def add_table(self, title: str, columns: Sequence[str], rows: Sequence[Sequence[Any]],
+                  priority: float = 0.0):
+        """Add a table; rows should be ranked most important first."""
+        header = [" | ".join(columns)]
+        lines = [" | ".join(format_value(value) for value in row) for row in rows]
+        self._add(_Section(title, header, lines, priority))
+
+    def _add(self, section: _Section):
+        if section.rows:
+            self.sections.append(section)
+            self._minimum_total += section.minimum_cost
+
+    def is_full(self) -> bool:
+        """True once the sections added so far fill the budget with their first rows alone."""
+        return self._minimum_total >= self.max_tokens
+
+    def build(self) -> str:
+        """Render the sections that fit into the budget."""
+        remaining = self.max_tokens
+        admitted = []
+        for section in sorted(self.sections, key=lambda section: -section.priority):
+            if section.minimum_cost <= remaining:
+                section.included = 1
+                remaining -= section.minimum_cost
+                admitted.append(section)
+
+        progress = True
+        while progress:
+            progress = False
+            for section in admitted:
+                if section.included == len(section.rows):
+                    continue
+                cost = estimate_tokens(section.rows[section.included]) + 1
+                if cost <= remaining:
+                    section.included += 1
+                    remaining -= cost
+                    progress = True
+
+        parts = []
+        for section in admitted:
+            lines = [f"## {section.title}", *section.header, *section.rows[:section.included]]
+            omitted = len(section.rows) - section.included
+            if omitted:
+                lines.append(f"(+{omitted} more rows)")
+            parts.append("\n".join(lines))
+
+        omitted_sections = self.omitted_sections + len(self.sections) - len(admitted)
+        if omitted_sections:
+            parts.append(f"({omitted_sections} more sections omitted)")
+        return "\n\n".join(parts)
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+from typing import AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+class BackgroundEventLoop:
+    """One event loop running for the life of the process in a daemon thread.
+
+    Synchronous callers such as Streamlit scripts submit coroutines to it
+    instead of creating and closing a loop per query. Clients cached across
+    queries (the AsyncOpenAI client's pooled connections, scheduler and
+    single-flight futures) stay bound to a loop that never closes.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="background-event-loop", daemon=True)
+        self._thread.start()
+
+    def run(self, coroutine: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the loop and block until it finishes."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    def iterate(self, iterator: AsyncIterator[T]) -> Iterator[T]:
+        """Consume an async iterator from synchronous code, one item per step."""
+        async def next_item():
+            try:
+                return True, await iterator.__anext__()
+            except StopAsyncIteration:
+                return False, None
+
+        try:
+            while True:
+                has_item, item = self.run(next_item())
+                if not has_item:
+                    return
+                yield item
+        finally:
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                self.run(aclose())
+
+_background_loop: Optional[BackgroundEventLoop] = None
+_background_loop_lock = threading.Lock()
+
+def get_background_loop() -> BackgroundEventLoop:
+    """Return the shared background loop, starting it on first use."""
+    global _background_loop
+
+    with _background_loop_lock:
+        if _background_loop is None:
+            _background_loop = BackgroundEventLoop()
+        return _background_loop
@@ -0,0 +1,117 @@
+"""
+Offline language detection for user queries.
+
+Scores English, German, French and Italian by stopword hits, Swiss energy
+vocabulary, typical word endings and language-specific characters. Used by
+LanguageTranslatorAgent to skip the LLM round trip for clear-cut queries.
+"""
+
+import re
+from typing import Dict, Tuple
+
+# Function words and Swiss energy vocabulary that are distinctive for one language.
+# Words shared between languages (e.g. "in", "la", "le", "un") are left out.
+LANGUAGE_VOCABULARY = {
+    "en": {
+        "the", "and", "is", "are", "what", "how", "does", "do", "of", "to", "for", "will",
+        "with", "between", "which", "can", "be", "by", "on", "from", "under", "about",
+        "why", "when", "should", "would", "show", "me", "much", "many", "change", "changes",
+        "compare", "explain", "used", "scenarios", "energy", "electricity", "emissions",
+        "renewable", "renewables", "consumption", "heating", "power", "switzerland",
+        "switzerland's", "nuclear", "transport", "buildings", "policies", "policy", "support",
+        "growth", "costs", "cost", "heat", "pumps", "generation", "demand", "progress",
+        "methodology", "net-zero", "business", "usual", "trends", "sector", "data",
+    },
+    "de": {
+        "der", "die", "das", "und", "ist", "sind", "wie", "was", "welche", "welcher",
+        "welches", "wird", "werden", "im", "mit", "von", "für", "bis", "zwischen", "den",
+        "dem", "des", "ein", "eine", "einen", "nicht", "auf", "bei", "hoch", "viel", "sich",
+        "zum", "zur", "vergleiche", "erkläre", "zeige", "warum", "wann", "gibt", "es",
+        "verwendete", "strom", "energie", "energien", "emissionen", "verbrauch",
+        "erneuerbare", "erneuerbaren", "szenario", "szenarien", "schweiz", "heizung",
+        "wärme", "wärmepumpen", "kernkraft", "kernkraftwerke", "verkehr", "gebäude",
+        "netto-null", "treibhausgase", "politiken", "fördern", "methodik", "entwickelt",
+        "elektromobilität", "stromverbrauch", "kosten", "weiter", "bisher",
+    },
+    "fr": {
+        "les", "des", "du", "et", "est", "sont", "comment", "quelle", "quel", "quels",
+        "quelles", "pour", "dans", "avec", "entre", "une", "que", "qui", "sur", "au",
+        "aux", "ce", "cette", "pourquoi", "quand", "combien", "comparer", "expliquer",
+        "utilisée", "progresse", "électricité", "énergie", "énergies", "émissions",
+        "consommation", "renouvelables", "scénario", "scénarios", "suisse", "chauffage",
+        "nucléaire", "transports", "bâtiments", "politiques", "soutiennent",
+        "méthodologie", "électrification", "coûts", "chaleur", "zéro",
+    },
+    "it": {
+        "il", "lo", "gli", "di", "del", "della", "delle", "dei", "degli", "e", "è",
+        "sono", "come", "quale", "quali", "per", "nel", "nella", "negli", "con", "tra",
+        "fra", "che", "una", "cosa", "quanto", "quanta", "perché", "quando", "confronta",
+        "spiega", "utilizzata", "progredisce", "elettricità", "energia", "energie",
+        "emissioni", "consumo", "rinnovabili", "scenari", "svizzera", "riscaldamento",
+        "nucleare", "trasporti", "edifici", "politiche", "supportano", "metodologia",
+        "elettrificazione", "costi", "calore",
+    },
+}
+
+# Word endings typical for one language (checked on words not in the vocabulary)
+LANGUAGE_SUFFIXES = {
+    "en": ("ing", "ness", "ity", "ed"),
+    "de": ("ung", "keit", "heit", "schaft", "lich", "ungen"),
+    "fr": ("tion", "tions", "ité", "ée", "ées", "eux", "ment"),
+    "it": ("zione", "zioni", "ità", "mente", "etto"),
+}
+
+LANGUAGE_CHARACTERS = {
+    "de": "äöüß",
+    "fr": "éèêçëîôû",
+    "it": "ìòù",
+}
+
+TOKEN_PATTERN = re.compile(r"[a-zà-ÿß][a-zà-ÿß'\-]*")
+
+def detect_language(text: str) -> Tuple[str, float]:
+    """Return (language code, confidence between 0 and 1) for a text.
+
+    Confidence combines how dominant the best language is with how much
+    evidence was found; texts without any evidence default to English with
+    confidence 0.
+    """
+    scores = score_languages(text)
+    total = sum(scores.values())
+
+    if total == 0:
+        return "en", 0.0
+
+    language = max(scores, key=scores.get)
+    dominance = scores[language] / total
+    evidence = min(1.0, total / 3.0)
+    return language, round(dominance * evidence, 3)
+
+def score_languages(text: str) -> Dict[str, float]:
+    """Score each supported language on a text."""
+    scores = {language: 0.0 for language in LANGUAGE_VOCABULARY}
+    tokens = TOKEN_PATTERN.findall(text.lower())
+
+    for token in tokens:
+        # Elided articles such as l'électrification or dell'energia
+        if "'" in token and not token.endswith("'s"):
+            prefix, _, token = token.partition("'")
+            if prefix in ("l", "d", "qu", "j", "n"):
+                scores["fr"] += 0.5
+                scores["it"] += 0.5
+
+        matched = False
+        for language, vocabulary in LANGUAGE_VOCABULARY.items():
+            if token in vocabulary:
+                scores[language] += 1.0
+                matched = True
+
+        if not matched and len(token) > 4:
+            for language, suffixes in LANGUAGE_SUFFIXES.items():
+                if token.endswith(suffixes):
+                    scores[language] += 0.5
+
+    for language, characters in LANGUAGE_CHARACTERS.items():
+        scores[language] += 0.5 * sum(1 for character in text.lower() if character in characters)
+
+    return scores
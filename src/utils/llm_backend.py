@@ -0,0 +1,109 @@
+import asyncio
+import json
+import re
+import threading
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional
+import openai
+from utils.config import config
+from utils.language_detection import detect_language
+
+# Answer to the orchestrator's routing prompt
+CANNED_ROUTING = {
+    "primary_agents": ["DataInterpreter", "ScenarioAnalyst"],
+    "query_type": "complex",
+    "complexity": "medium",
+    "user_type": "citizen",
+    "data_needs": ["csv_data", "scenario_comparison"]
+}
+
+CANNED_ANSWER = (
+    "Under the ZERO-Basis scenario, Switzerland likely reaches net-zero greenhouse gas emissions by 2050, "
+    "driven by electrification of transport and heating, expansion of photovoltaics and lower final energy "
+    "demand. The WWB scenario continues current policies and misses the target. "
+    "(Canned answer from the fake LLM backend.)"
+)
+
+TRANSLATION_PATTERN = re.compile(
+    r"^translate_\w+: (?P<text>.*?)(?: \((?:from|to) [^)]*\)| \| target_language: \w+)?$", re.DOTALL
+)
+
+class FakeLLMClient:
+    """In-process stand-in for openai.AsyncOpenAI without network access.
+
+    Answers chat completions after a fixed latency with canned content:
+    routing JSON for the orchestrator's routing prompt, the local language
+    detector's result for language detection, the source text for
+    translations and a fixed paragraph otherwise. Counts requests by kind
+    so benchmarks can report how many LLM calls a query needed.
+    """
+
+    base_url = "fake://llm"
+
+    def __init__(self, latency: float = 0.5):
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, model: str, messages: List[Dict[str, str]], stream: bool = False, **kwargs):
+        kind, content = self._answer(messages[-1]["content"])
+        with self._lock:
+            self.calls[kind] += 1
+
+        await asyncio.sleep(self.latency)
+        if stream:
+            return self._stream(content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    async def _stream(self, content: str) -> AsyncIterator[Any]:
+        for i, word in enumerate(content.split(" ")):
+            delta = SimpleNamespace(content=word if i == 0 else " " + word)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    @staticmethod
+    def _answer(prompt: str):
+        """Classify a prompt and return (request kind, canned content)."""
+        if "determine which agents should handle it" in prompt:
+            return "routing", json.dumps(CANNED_ROUTING)
+
+        if prompt.startswith("detect_language: "):
+            return "language_detection", detect_language(prompt[len("detect_language: "):])[0]
+
+        match = TRANSLATION_PATTERN.match(prompt)
+        if match:
+            # Batches are echoed as the same JSON array, one entry per segment
+            return "translation", match.group("text")
+
+        return "completion", CANNED_ANSWER
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"latency_s": self.latency, "calls": dict(self.calls), "total_calls": sum(self.calls.values())}
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls.clear()
+
+_fake_client: Optional[FakeLLMClient] = None
+_fake_client_lock = threading.Lock()
+
+def get_fake_llm_client() -> FakeLLMClient:
+    """Return the shared fake client, so call counts cover all agents."""
+    global _fake_client
+
+    with _fake_client_lock:
+        if _fake_client is None:
+            _fake_client = FakeLLMClient(latency=config.fake_llm_latency)
+        return _fake_client
+
+def create_llm_client(api_key: Optional[str]):
+    """Create the chat completion client selected by LLM_BACKEND."""
+    if config.llm_backend == "fake":
+        return get_fake_llm_client()
+    if config.llm_backend != "openai":
+        print(f"Unknown LLM backend '{config.llm_backend}', using openai")
+    # Retries are handled by the agents, so the client's own are disabled. The
+    # timeout turns a hanging backend into errors the circuit breaker counts.
+    return openai.AsyncOpenAI(api_key=api_key, max_retries=0, timeout=config.llm_request_timeout_seconds)
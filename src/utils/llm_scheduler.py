@@ -0,0 +1,251 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from utils.config import config
+
+# Priority classes; lower values are served first
+PRIORITY_INTERACTIVE = 0  # On the user's critical path: routing, synthesis, translation
+PRIORITY_NORMAL = 1       # Specialist agent analysis
+PRIORITY_BACKGROUND = 2   # Warmup and other work nobody is waiting for
+
+MAX_BACKOFF_SECONDS = 60.0
+
+def parse_model_limits(spec: str) -> Dict[str, Tuple[int, float]]:
+    """Parse "model=concurrency/requests_per_minute,..." into {model: (concurrency, rpm)}."""
+    limits = {}
+    for entry in filter(None, (part.strip() for part in (spec or "").split(","))):
+        try:
+            model, values = entry.split("=", 1)
+            concurrency, _, requests_per_minute = values.partition("/")
+            limits[model.strip()] = (int(concurrency), float(requests_per_minute or 0))
+        except ValueError:
+            print(f"Ignoring invalid LLM model limit: {entry}")
+    return limits
+
+class _Waiter:
+    __slots__ = ("priority", "sequence", "loop", "future", "enqueued_at", "granted", "cancelled")
+
+    def __init__(self, priority: int, sequence: int, loop: asyncio.AbstractEventLoop, future: asyncio.Future):
+        self.priority = priority
+        self.sequence = sequence
+        self.loop = loop
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.cancelled = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+class _ModelLimiter:
+    """Concurrency cap, token bucket and backoff state for one model."""
+
+    def __init__(self, max_concurrency: int, requests_per_minute: float):
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency_limit = self.max_concurrency  # Lowered after rate limit errors
+        self.refill_rate = requests_per_minute / 60.0 if requests_per_minute > 0 else None
+        self.capacity = float(self.max_concurrency)
+        self.tokens = self.capacity
+        self.refilled_at = time.monotonic()
+
+        self.active = 0
+        self.waiters: List[_Waiter] = []
+        self.backoff_until = 0.0
+        self.consecutive_rate_limits = 0
+        self.timer: Optional[threading.Timer] = None
+
+        self.requests = 0
+        self.rate_limited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def refill(self, now: float):
+        if self.refill_rate is None:
+            self.tokens = self.capacity
+        else:
+            self.tokens = min(self.capacity, self.tokens + (now - self.refilled_at) * self.refill_rate)
+        self.refilled_at = now
+
+class RequestSlot:
+    """Permission to send one request; report rate limit errors through it."""
+
+    def __init__(self, scheduler: "LLMScheduler", model: str, priority: int):
+        self.scheduler = scheduler
+        self.model = model
+        self.priority = priority
+        self.retry_after: Optional[float] = None
+        self.was_rate_limited = False
+
+    def rate_limited(self, retry_after: Optional[float] = None):
+        """Mark the request as rejected with HTTP 429."""
+        self.was_rate_limited = True
+        self.retry_after = retry_after
+
+    async def __aenter__(self) -> "RequestSlot":
+        await self.scheduler.acquire(self.model, self.priority)
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        self.scheduler.release(self.model, self.was_rate_limited, self.retry_after)
+        return False
+
+class LLMScheduler:
+    """Process-wide admission control for LLM requests.
+
+    Each model has a concurrency cap and an optional requests-per-minute
+    token bucket. Waiting requests are served by priority class, then in
+    arrival order. A 429 halves the model's concurrency and pauses it with
+    exponential backoff (or the server's Retry-After); successes raise the
+    concurrency again one step at a time. Works across threads and event
+    loops, e.g. concurrent Streamlit sessions.
+    """
+
+    def __init__(self, max_concurrency: int = 8, requests_per_minute: float = 0,
+                 model_limits: Optional[Dict[str, Tuple[int, float]]] = None):
+        self.default_limits = (max_concurrency, requests_per_minute)
+        self.model_limits = dict(model_limits or {})
+        self._limiters: Dict[str, _ModelLimiter] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def slot(self, model: str, priority: int = PRIORITY_NORMAL) -> RequestSlot:
+        """Async context manager holding one request slot for a model."""
+        return RequestSlot(self, model, priority)
+
+    def _get_limiter(self, model: str) -> _ModelLimiter:
+        limiter = self._limiters.get(model)
+        if limiter is None:
+            limiter = _ModelLimiter(*self.model_limits.get(model, self.default_limits))
+            self._limiters[model] = limiter
+        return limiter
+
+    async def acquire(self, model: str, priority: int = PRIORITY_NORMAL):
+        """Wait until a request to the model may be sent."""
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(priority, next(self._sequence), loop, loop.create_future())
+
+        with self._lock:
+            limiter = self._get_limiter(model)
+            heapq.heappush(limiter.waiters, waiter)
+            self._dispatch(limiter)
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if not waiter.granted:
+                    waiter.cancelled = True
+                elif waiter.future.done() and not waiter.future.cancelled():
+                    # Cancelled after _grant handed over the slot; nobody will release it
+                    limiter.active -= 1
+                    self._dispatch(limiter)
+            # A slot granted but not yet handed over is handed back by _grant
+            raise
+
+    def release(self, model: str, rate_limited: bool = False, retry_after: Optional[float] = None):
+        """Return a slot and adapt the model's limits to the outcome."""
+        with self._lock:
+            limiter = self._get_limiter(model)
+            limiter.active -= 1
+
+            if rate_limited:
+                limiter.rate_limited += 1
+                limiter.consecutive_rate_limits += 1
+                limiter.concurrency_limit = max(1, limiter.concurrency_limit // 2)
+                backoff = retry_after or min(MAX_BACKOFF_SECONDS, 2.0 ** (limiter.consecutive_rate_limits - 1))
+                limiter.backoff_until = max(limiter.backoff_until, time.monotonic() + backoff)
+            else:
+                limiter.consecutive_rate_limits = 0
+                limiter.concurrency_limit = min(limiter.max_concurrency, limiter.concurrency_limit + 1)
+
+            self._dispatch(limiter)
+
+    def _dispatch(self, limiter: _ModelLimiter):
+        """Grant slots to waiting requests while the limits allow; call with the lock held."""
+        now = time.monotonic()
+        limiter.refill(now)
+
+        while limiter.waiters and limiter.active < limiter.concurrency_limit:
+            if limiter.waiters[0].cancelled:
+                heapq.heappop(limiter.waiters)
+                continue
+            if now < limiter.backoff_until or limiter.tokens < 1:
+                break
+
+            waiter = heapq.heappop(limiter.waiters)
+            waiter.granted = True
+            limiter.active += 1
+            limiter.tokens -= 1
+            limiter.requests += 1
+
+            wait = now - waiter.enqueued_at
+            limiter.total_wait += wait
+            limiter.max_wait = max(limiter.max_wait, wait)
+
+            try:
+                waiter.loop.call_soon_threadsafe(self._grant, waiter, limiter)
+            except RuntimeError:
+                # The waiter's event loop is closed; nobody will use the slot
+                limiter.active -= 1
+
+        # Wake up again once backoff ends or a token is available
+        if limiter.waiters and limiter.timer is None and limiter.active < limiter.concurrency_limit:
+            delay = max(limiter.backoff_until - now, 0.0)
+            if limiter.tokens < 1 and limiter.refill_rate:
+                delay = max(delay, (1 - limiter.tokens) / limiter.refill_rate)
+            if delay > 0:
+                limiter.timer = threading.Timer(delay, self._on_timer, args=(limiter,))
+                limiter.timer.daemon = True
+                limiter.timer.start()
+
+    def _on_timer(self, limiter: _ModelLimiter):
+        with self._lock:
+            limiter.timer = None
+            self._dispatch(limiter)
+
+    def _grant(self, waiter: _Waiter, limiter: _ModelLimiter):
+        """Runs in the waiter's event loop; hands the slot back if the wait was cancelled."""
+        if waiter.future.done():
+            with self._lock:
+                limiter.active -= 1
+                self._dispatch(limiter)
+        else:
+            waiter.future.set_result(None)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth, wait times and limit state per model."""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                model: {
+                    "queue_depth": sum(1 for waiter in limiter.waiters if not waiter.cancelled),
+                    "active": limiter.active,
+                    "concurrency_limit": limiter.concurrency_limit,
+                    "max_concurrency": limiter.max_concurrency,
+                    "requests": limiter.requests,
+                    "rate_limited": limiter.rate_limited,
+                    "average_wait_ms": limiter.total_wait / limiter.requests * 1000 if limiter.requests else 0.0,
+                    "max_wait_ms": limiter.max_wait * 1000,
+                    "backoff_remaining_s": max(0.0, limiter.backoff_until - now)
+                }
+                for model, limiter in self._limiters.items()
+            }
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Return the shared scheduler configured from the environment."""
+    global _scheduler
+
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler(
+                max_concurrency=config.llm_max_concurrency,
+                requests_per_minute=config.llm_requests_per_minute,
+                model_limits=parse_model_limits(config.llm_model_limits)
+            )
+        return _scheduler
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from utils.config import config
+
+class ResponseCache:
+    """Persistent SQLite cache of LLM responses.
+
+    Entries are addressed by a hash of the backend, model, sampling parameters
+    and the normalized message list. Entries older than ttl_seconds are ignored and
+    the least recently used ones are evicted beyond max_entries.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: float = 7 * 24 * 3600, max_entries: int = 5000):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                       key TEXT PRIMARY KEY,
+                       model TEXT,
+                       content TEXT NOT NULL,
+                       created_at REAL NOT NULL,
+                       accessed_at REAL NOT NULL
+                   )"""
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_accessed_at ON responses (accessed_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    @staticmethod
+    def make_key(backend: str, model: str, messages: List[Dict[str, str]], **parameters: Any) -> str:
+        """Hash the request; whitespace differences in messages do not matter.
+
+        The backend (the client's base URL) is part of the key, so answers of
+        the fake backend or another compatible server are never served as
+        answers of the real one.
+        """
+        normalized = [
+            {"role": message.get("role"), "content": " ".join(str(message.get("content", "")).split())}
+            for message in messages
+        ]
+        payload = json.dumps({"backend": backend, "model": model, "messages": normalized, "parameters": parameters},
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response, or None if missing or expired."""
+        now = time.time()
+
+        with self._lock, self._connect() as connection:
+            row = connection.execute(
+                "SELECT content, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+
+            connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, content: str, model: Optional[str] = None):
+        """Store a response and evict the least recently used overflow."""
+        now = time.time()
+
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, model, content, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, content, now, now)
+            )
+            connection.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        with self._lock, self._connect() as connection:
+            connection.execute("DELETE FROM responses")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock, self._connect() as connection:
+            entries = connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"entries": entries, "hits": self.hits, "misses": self.misses,
+                "ttl_seconds": self.ttl_seconds, "max_entries": self.max_entries}
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the shared response cache configured from the environment.
+
+    Returns None when LLM_CACHE_ENABLED is false or the database cannot be opened.
+    """
+    global _response_cache
+
+    if not config.llm_cache_enabled:
+        return None
+
+    with _response_cache_lock:
+        if _response_cache is None:
+            try:
+                _response_cache = ResponseCache(
+                    config.llm_cache_path,
+                    ttl_seconds=config.llm_cache_ttl_hours * 3600,
+                    max_entries=config.llm_cache_max_entries
+                )
+            except sqlite3.Error as e:
+                print(f"Error opening LLM response cache: {e}")
+                return None
+        return _response_cache
@@ -0,0 +1,171 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class _Broadcast:
+    """Items of one shared stream, replayed to each subscriber from the start."""
+
+    def __init__(self):
+        self.items: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._lock = threading.Lock()
+
+    def publish(self, item: Any):
+        with self._lock:
+            self.items.append(item)
+            waiters, self._waiters = self._waiters, []
+        self._wake(waiters)
+
+    def finish(self, error: Optional[BaseException] = None):
+        with self._lock:
+            self.done = True
+            self.error = error
+            waiters, self._waiters = self._waiters, []
+        self._wake(waiters)
+
+    @staticmethod
+    def _wake(waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]):
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(lambda future=future: future.done() or future.set_result(None))
+            except RuntimeError:
+                pass  # The subscriber's event loop is closed
+
+    async def get(self, index: int) -> Tuple[bool, Any]:
+        """Return (True, item) for the item at index once produced, or (False, None) at the end."""
+        while True:
+            with self._lock:
+                if index < len(self.items):
+                    return True, self.items[index]
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return False, None
+                loop = asyncio.get_running_loop()
+                future = loop.create_future()
+                self._waiters.append((loop, future))
+            await future
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the work; callers arriving while it is in
+    flight await the same result instead of starting their own. stream() does
+    the same for async iterators, fanning one run's items out to every
+    caller. Results are shared, so callers must treat them as read-only.
+    Works across threads and event loops, e.g. concurrent Streamlit sessions.
+    """
+
+    def __init__(self):
+        self.executions = 0
+        self.coalesced = 0
+        self._futures: Dict[str, concurrent.futures.Future] = {}
+        self._streams: Dict[str, _Broadcast] = {}
+        self._lock = threading.Lock()
+
+    async def run(self, key: str, work: Callable[[], Awaitable[T]]) -> T:
+        """Return the result of work(), shared with identical in-flight calls."""
+        while True:
+            with self._lock:
+                future = self._futures.get(key)
+                leader = future is None
+                if leader:
+                    future = concurrent.futures.Future()
+                    self._futures[key] = future
+                    self.executions += 1
+                else:
+                    self.coalesced += 1
+
+            if leader:
+                break
+
+            try:
+                # Shield so a cancelled follower does not cancel the shared result
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader was cancelled (e.g. by its own timeout); run again
+
+        try:
+            result = await work()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._futures[key]
+
+    async def stream(self, key: str, work: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """Yield the items of work(), shared with identical in-flight calls.
+
+        The first caller starts work() as a task; callers arriving while it
+        runs get the items produced so far, then each new one as it comes.
+        The task is cancelled once every caller has stopped listening.
+        """
+        with self._lock:
+            broadcast = self._streams.get(key)
+            leader = broadcast is None
+            if leader:
+                broadcast = _Broadcast()
+                self._streams[key] = broadcast
+                self.executions += 1
+            else:
+                self.coalesced += 1
+            broadcast.subscribers += 1
+
+        if leader:
+            broadcast.task = asyncio.create_task(self._produce(key, broadcast, work))
+
+        try:
+            index = 0
+            while True:
+                has_item, item = await broadcast.get(index)
+                if not has_item:
+                    return
+                index += 1
+                yield item
+        finally:
+            with self._lock:
+                broadcast.subscribers -= 1
+                abandoned = broadcast.subscribers == 0 and not broadcast.done
+                if abandoned and self._streams.get(key) is broadcast:
+                    # Later callers start a new run instead of joining a cancelled one
+                    del self._streams[key]
+            if abandoned and broadcast.task is not None:
+                broadcast.task.get_loop().call_soon_threadsafe(broadcast.task.cancel)
+
+    async def _produce(self, key: str, broadcast: _Broadcast, work: Callable[[], AsyncIterator[T]]):
+        try:
+            async for item in work():
+                broadcast.publish(item)
+        except Exception as e:
+            broadcast.finish(e)
+        except BaseException as e:
+            # Cancelled once nobody listens any more
+            broadcast.finish(e)
+            raise
+        else:
+            broadcast.finish()
+        finally:
+            with self._lock:
+                if self._streams.get(key) is broadcast:
+                    del self._streams[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"executions": self.executions, "coalesced": self.coalesced,
+                    "in_flight": len(self._futures) + len(self._streams)}
@@ -0,0 +1,251 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from utils.config import config
+
+# Swiss energy scenario terms with fixed translations; scenario names stay as they are
+GLOSSARY = {
+    "ZERO-Basis": {"de": "ZERO-Basis", "fr": "ZERO-Basis", "it": "ZERO-Basis"},
+    "WWB": {"de": "WWB", "fr": "WWB", "it": "WWB"},
+    "KKW50": {"de": "KKW50", "fr": "KKW50", "it": "KKW50"},
+    "ZERO-Basis scenario": {"de": "ZERO-Basis-Szenario", "fr": "scénario ZERO-Basis",
+                            "it": "scenario ZERO-Basis"},
+    "WWB scenario": {"de": "WWB-Szenario", "fr": "scénario WWB", "it": "scenario WWB"},
+    "Business as usual (WWB)": {"de": "Weiter wie bisher (WWB)",
+                                "fr": "Poursuite de la politique actuelle (WWB)",
+                                "it": "Proseguimento della politica attuale (WWB)"},
+    "KKW50 variant (nuclear operation until 2050)": {
+        "de": "Variante KKW50 (Betrieb der Kernkraftwerke bis 2050)",
+        "fr": "Variante KKW50 (exploitation nucléaire jusqu'en 2050)",
+        "it": "Variante KKW50 (esercizio nucleare fino al 2050)"
+    },
+    "net-zero": {"de": "Netto-Null", "fr": "zéro net", "it": "zero netto"},
+    "Energy Strategy 2050": {"de": "Energiestrategie 2050", "fr": "Stratégie énergétique 2050",
+                             "it": "Strategia energetica 2050"},
+}
+
+# Fixed follow-up suggestions produced by the agents
+SUGGESTION_TRANSLATIONS = {
+    # OrchestratorAgent
+    "Try asking about specific energy data or scenarios": {
+        "de": "Fragen Sie nach konkreten Energiedaten oder Szenarien",
+        "fr": "Essayez de poser une question sur des données énergétiques ou des scénarios précis",
+        "it": "Provi a chiedere dati energetici o scenari specifici"
+    },
+    # DataInterpreterAgent
+    "Try asking about specific sectors like transport, buildings, or electricity generation": {
+        "de": "Fragen Sie nach bestimmten Sektoren wie Verkehr, Gebäude oder Stromerzeugung",
+        "fr": "Essayez de poser une question sur des secteurs précis comme les transports, "
+              "les bâtiments ou la production d'électricité",
+        "it": "Provi a chiedere di settori specifici come trasporti, edifici o produzione di elettricità"
+    },
+    "Compare the same data across different scenarios (ZERO-Basis vs WWB)": {
+        "de": "Dieselben Daten über verschiedene Szenarien hinweg vergleichen (ZERO-Basis vs. WWB)",
+        "fr": "Comparer les mêmes données entre différents scénarios (ZERO-Basis vs WWB)",
+        "it": "Confrontare gli stessi dati tra scenari diversi (ZERO-Basis vs WWB)"
+    },
+    "Explore electricity generation by technology": {
+        "de": "Stromerzeugung nach Technologie untersuchen",
+        "fr": "Explorer la production d'électricité par technologie",
+        "it": "Esplorare la produzione di elettricità per tecnologia"
+    },
+    "Check seasonal patterns (winter vs summer)": {
+        "de": "Saisonale Muster prüfen (Winter vs. Sommer)",
+        "fr": "Vérifier les variations saisonnières (hiver vs été)",
+        "it": "Verificare gli andamenti stagionali (inverno vs estate)"
+    },
+    "Analyze emissions by sector": {
+        "de": "Emissionen nach Sektor analysieren",
+        "fr": "Analyser les émissions par secteur",
+        "it": "Analizzare le emissioni per settore"
+    },
+    "Look at the relationship between energy consumption and emissions": {
+        "de": "Den Zusammenhang zwischen Energieverbrauch und Emissionen betrachten",
+        "fr": "Examiner la relation entre la consommation d'énergie et les émissions",
+        "it": "Esaminare la relazione tra consumo energetico ed emissioni"
+    },
+    # ScenarioAnalystAgent
+    "Analyze the timeline and milestones for achieving scenario targets": {
+        "de": "Zeitplan und Meilensteine zur Erreichung der Szenarioziele analysieren",
+        "fr": "Analyser le calendrier et les étapes clés pour atteindre les objectifs des scénarios",
+        "it": "Analizzare la tempistica e le tappe per raggiungere gli obiettivi degli scenari"
+    },
+    "Compare transport sector transformation across scenarios": {
+        "de": "Transformation des Verkehrssektors zwischen den Szenarien vergleichen",
+        "fr": "Comparer la transformation du secteur des transports entre les scénarios",
+        "it": "Confrontare la trasformazione del settore dei trasporti tra gli scenari"
+    },
+    "Examine building heating transformation pathways": {
+        "de": "Transformationspfade für die Gebäudeheizung untersuchen",
+        "fr": "Examiner les trajectoires de transformation du chauffage des bâtiments",
+        "it": "Esaminare i percorsi di trasformazione del riscaldamento degli edifici"
+    },
+    "Explore policy instruments needed to achieve each scenario": {
+        "de": "Politische Instrumente untersuchen, die für jedes Szenario nötig sind",
+        "fr": "Explorer les instruments politiques nécessaires pour réaliser chaque scénario",
+        "it": "Esplorare gli strumenti politici necessari per realizzare ciascuno scenario"
+    },
+    "Assess risks and uncertainties for each scenario pathway": {
+        "de": "Risiken und Unsicherheiten jedes Szenariopfads bewerten",
+        "fr": "Évaluer les risques et incertitudes de chaque trajectoire de scénario",
+        "it": "Valutare rischi e incertezze di ciascun percorso di scenario"
+    },
+    # DocumentIntelligenceAgent
+    "Ask about specific topics like methodology, scenarios, or sector analysis": {
+        "de": "Fragen Sie nach bestimmten Themen wie Methodik, Szenarien oder Sektoranalysen",
+        "fr": "Posez une question sur des thèmes précis comme la méthodologie, les scénarios "
+              "ou l'analyse sectorielle",
+        "it": "Chieda di temi specifici come metodologia, scenari o analisi settoriale"
+    },
+    "Check the technical report for detailed methodology": {
+        "de": "Den technischen Bericht für die detaillierte Methodik konsultieren",
+        "fr": "Consulter le rapport technique pour la méthodologie détaillée",
+        "it": "Consultare il rapporto tecnico per la metodologia dettagliata"
+    },
+    "Review the executive summary for key policy insights": {
+        "de": "Die Zusammenfassung auf zentrale politische Erkenntnisse durchsehen",
+        "fr": "Parcourir le résumé pour les principaux enseignements politiques",
+        "it": "Consultare la sintesi per le principali indicazioni politiche"
+    },
+    "Explore the methodology and assumptions used": {
+        "de": "Die verwendete Methodik und die Annahmen untersuchen",
+        "fr": "Explorer la méthodologie et les hypothèses utilisées",
+        "it": "Esplorare la metodologia e le ipotesi utilizzate"
+    },
+    "Compare findings across different scenarios": {
+        "de": "Ergebnisse verschiedener Szenarien vergleichen",
+        "fr": "Comparer les résultats entre différents scénarios",
+        "it": "Confrontare i risultati tra scenari diversi"
+    },
+    # PolicyContextAgent
+    "Explore specific implementation pathways and timelines": {
+        "de": "Konkrete Umsetzungspfade und Zeitpläne untersuchen",
+        "fr": "Explorer des trajectoires de mise en œuvre et des calendriers concrets",
+        "it": "Esplorare percorsi di attuazione e tempistiche concrete"
+    },
+    "Assess stakeholder impacts and coordination needs": {
+        "de": "Auswirkungen auf Anspruchsgruppen und Koordinationsbedarf bewerten",
+        "fr": "Évaluer les impacts sur les parties prenantes et les besoins de coordination",
+        "it": "Valutare gli impatti sulle parti interessate e le esigenze di coordinamento"
+    },
+    "Examine economic instruments and financing mechanisms": {
+        "de": "Ökonomische Instrumente und Finanzierungsmechanismen prüfen",
+        "fr": "Examiner les instruments économiques et les mécanismes de financement",
+        "it": "Esaminare gli strumenti economici e i meccanismi di finanziamento"
+    },
+    "Consider international cooperation and EU policy alignment": {
+        "de": "Internationale Zusammenarbeit und Abstimmung mit der EU-Politik berücksichtigen",
+        "fr": "Prendre en compte la coopération internationale et l'alignement sur la politique de l'UE",
+        "it": "Considerare la cooperazione internazionale e l'allineamento con la politica dell'UE"
+    },
+    "Analyze transport policy instruments and regulations": {
+        "de": "Verkehrspolitische Instrumente und Vorschriften analysieren",
+        "fr": "Analyser les instruments et réglementations de la politique des transports",
+        "it": "Analizzare gli strumenti e le normative della politica dei trasporti"
+    },
+}
+
+class TranslationMemory:
+    """Persistent SQLite store of translated texts.
+
+    Entries are addressed by a hash of the whitespace-normalized source text
+    and the target language. The glossary and the fixed agent suggestions are
+    seeded on startup, so their translations never need a model call.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS translations (
+                       source_hash TEXT NOT NULL,
+                       target_language TEXT NOT NULL,
+                       source_text TEXT NOT NULL,
+                       translation TEXT NOT NULL,
+                       origin TEXT NOT NULL,
+                       updated_at REAL NOT NULL,
+                       PRIMARY KEY (source_hash, target_language)
+                   )"""
+            )
+
+        self.seed({**GLOSSARY, **SUGGESTION_TRANSLATIONS})
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        """Hash a source text; whitespace differences do not matter."""
+        return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+    def get(self, text: str, target_language: str) -> Optional[str]:
+        """Return the stored translation, or None if the text is unknown."""
+        with self._lock, self._connect() as connection:
+            row = connection.execute(
+                "SELECT translation FROM translations WHERE source_hash = ? AND target_language = ?",
+                (self.make_key(text), target_language)
+            ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return row[0]
+
+    # Seeded entries are not overwritten by model output
+    _UPSERT = (
+        "INSERT INTO translations (source_hash, target_language, source_text, translation, origin, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (source_hash, target_language) DO UPDATE SET "
+        "translation = excluded.translation, origin = excluded.origin, updated_at = excluded.updated_at "
+        "WHERE translations.origin != 'seed' OR excluded.origin = 'seed'"
+    )
+
+    def put(self, text: str, target_language: str, translation: str, origin: str = "model"):
+        """Store a translation."""
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                self._UPSERT, (self.make_key(text), target_language, text, translation, origin, time.time())
+            )
+
+    def seed(self, entries: Dict[str, Dict[str, str]]):
+        """Store fixed translations given as {source text: {language: translation}}."""
+        now = time.time()
+        rows = [
+            (self.make_key(text), target_language, text, translation, "seed", now)
+            for text, translations in entries.items()
+            for target_language, translation in translations.items()
+        ]
+
+        with self._lock, self._connect() as connection:
+            connection.executemany(self._UPSERT, rows)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock, self._connect() as connection:
+            entries = connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        return {"entries": entries, "hits": self.hits, "misses": self.misses}
+
+_translation_memory: Optional[TranslationMemory] = None
+_translation_memory_lock = threading.Lock()
+
+def get_translation_memory() -> Optional[TranslationMemory]:
+    """Return the shared translation memory, or None if the database cannot be opened."""
+    global _translation_memory
+
+    with _translation_memory_lock:
+        if _translation_memory is None:
+            try:
+                _translation_memory = TranslationMemory(config.translation_memory_path)
+            except sqlite3.Error as e:
+                print(f"Error opening translation memory: {e}")
+                return None
+        return _translation_memory
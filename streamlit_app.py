@@ -3,7 +3,6 @@ Swiss Energy Scenarios Decipher System - Multilingual Streamlit Web Interface
 """
 
 import streamlit as st
-import asyncio
 import sys
 import os
 from typing import Dict, Any
@@ -13,12 +12,15 @@ import pandas as pd
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from utils.config import config
+from agents.base_agent import AgentResponse
 from agents.orchestrator_agent import OrchestratorAgent
 from agents.data_interpreter_agent import DataInterpreterAgent
 from agents.scenario_analyst_agent import ScenarioAnalystAgent
 from agents.document_intelligence_agent import DocumentIntelligenceAgent
 from agents.policy_context_agent import PolicyContextAgent
 from agents.language_translator_agent import LanguageTranslatorAgent
+from data_processors.data_registry import get_data_registry
+from utils.event_loop import get_background_loop
 
 # Language translations
 TRANSLATIONS = {
@@ -261,10 +263,13 @@ def initialize_agents():
     """Initialize all agents - cached for performance."""
     config.validate()
     
+    # Shared data layer for all agents
+    data_registry = get_data_registry(config.data_path, config.reports_path)
+    
     # Initialize specialist agents
-    data_interpreter = DataInterpreterAgent(config.openai_api_key, config.data_path)
-    scenario_analyst = ScenarioAnalystAgent(config.openai_api_key, config.data_path)
-    document_intelligence = DocumentIntelligenceAgent(config.openai_api_key, config.reports_path)
+    data_interpreter = DataInterpreterAgent(config.openai_api_key, config.data_path, data_registry)
+    scenario_analyst = ScenarioAnalystAgent(config.openai_api_key, config.data_path, data_registry)
+    document_intelligence = DocumentIntelligenceAgent(config.openai_api_key, config.reports_path, data_registry)
     policy_context = PolicyContextAgent(config.openai_api_key)
     
     # Initialize orchestrator
@@ -439,21 +444,25 @@ def process_query(query: str, user_type: str, language: str):
             # Prepare context
             context = {"user_type": user_type, "language": language}
             
-            # Process query
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            response = loop.run_until_complete(
-                orchestrator.process_query(query, context)
-            )
-            loop.close()
+            # Main response, rendered as it streams in
+            st.subheader(get_text("response", language))
+            placeholder = st.empty()
+            
+            # Process query on the shared loop the cached agents' clients are bound to
+            streamed_text = ""
+            response = None
+            for chunk in get_background_loop().iterate(orchestrator.stream_query(query, context)):
+                if isinstance(chunk, AgentResponse):
+                    response = chunk
+                else:
+                    streamed_text += chunk
+                    placeholder.markdown(streamed_text + "▌")
+            
+            placeholder.markdown(response.content)
             
             # Display results
             st.success(get_text("analysis_complete", language))
             
-            # Main response
-            st.subheader(get_text("response", language))
-            st.write(response.content)
-            
             # Metadata in columns
             col1, col2, col3 = st.columns(3)
             
@@ -3,7 +3,6 @@ Swiss Energy Scenarios Decipher System - Deutsche Streamlit Web-Oberfläche
 """
 
 import streamlit as st
-import asyncio
 import sys
 import os
 from typing import Dict, Any
@@ -18,6 +17,8 @@ from agents.data_interpreter_agent import DataInterpreterAgent
 from agents.scenario_analyst_agent import ScenarioAnalystAgent
 from agents.document_intelligence_agent import DocumentIntelligenceAgent
 from agents.policy_context_agent import PolicyContextAgent
+from data_processors.data_registry import get_data_registry
+from utils.event_loop import get_background_loop
 
 # Configure Streamlit page
 st.set_page_config(
@@ -32,10 +33,13 @@ def initialize_agents():
     """Alle Agenten initialisieren - gecacht für bessere Performance."""
     config.validate()
     
+    # Gemeinsame Datenschicht für alle Agenten
+    data_registry = get_data_registry(config.data_path, config.reports_path)
+    
     # Spezialisierte Agenten initialisieren
-    data_interpreter = DataInterpreterAgent(config.openai_api_key, config.data_path)
-    scenario_analyst = ScenarioAnalystAgent(config.openai_api_key, config.data_path)
-    document_intelligence = DocumentIntelligenceAgent(config.openai_api_key, config.reports_path)
+    data_interpreter = DataInterpreterAgent(config.openai_api_key, config.data_path, data_registry)
+    scenario_analyst = ScenarioAnalystAgent(config.openai_api_key, config.data_path, data_registry)
+    document_intelligence = DocumentIntelligenceAgent(config.openai_api_key, config.reports_path, data_registry)
     policy_context = PolicyContextAgent(config.openai_api_key)
     
     # Orchestrator initialisieren
@@ -196,12 +200,9 @@ def process_query(query: str, user_type: str):
             context = {"user_type": user_type}
             
             # Anfrage verarbeiten
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            response = loop.run_until_complete(
+            response = get_background_loop().run(
                 orchestrator.process_query(query, context)
             )
-            loop.close()
             
             # Ergebnisse anzeigen
             st.success("✅ Analyse abgeschlossen!")
@@ -17,6 +17,12 @@ try:
     from agents.scenario_analyst_agent import ScenarioAnalystAgent
     from agents.document_intelligence_agent import DocumentIntelligenceAgent
     from agents.policy_context_agent import PolicyContextAgent
+    from agents.base_agent import AgentResponse
+    from utils.event_loop import get_background_loop
+    from utils.circuit_breaker import CircuitBreaker
+    from utils.llm_backend import FakeLLMClient
+    from utils.llm_scheduler import LLMScheduler
+    from utils.single_flight import SingleFlight
 except ImportError as e:
     print(f"❌ Import error: {e}")
     print("Make sure you're running from the project root directory with .venv activated")
@@ -134,6 +140,125 @@ async def test_simple_query(orchestrator):
         print(f"❌ Query test failed: {e}")
         return False
 
+def test_consecutive_ui_queries():
+    """Test that the web UI can answer several queries with the same cached agents."""
+    print("\n🖥️  Testing Consecutive UI Queries...")
+    
+    try:
+        # Agents are created once and reused across queries, like the
+        # @st.cache_resource agents of the Streamlit apps
+        orchestrator = OrchestratorAgent(config.openai_api_key)
+        orchestrator.register_agent(DataInterpreterAgent(config.openai_api_key, config.data_path))
+        orchestrator.register_agent(PolicyContextAgent(config.openai_api_key))
+        
+        # Clients cached across queries stay bound to the loop of their first
+        # request, so every query must run on the same, still open loop
+        loops = []
+        
+        async def on_loop(stream):
+            loops.append(asyncio.get_running_loop())
+            async for chunk in stream:
+                yield chunk
+        
+        queries = ["How does electricity consumption change by sector?",
+                   "What policies are needed to achieve net-zero by 2050?"]
+        for query in queries:
+            responses = [chunk for chunk in get_background_loop().iterate(
+                on_loop(orchestrator.stream_query(query, {"user_type": "citizen", "language": "en"})))
+                if isinstance(chunk, AgentResponse)]
+            
+            if not responses or responses[-1].confidence == 0.0:
+                print(f"❌ Query failed: {query}")
+                if responses:
+                    print(f"   {responses[-1].content[:200]}")
+                return False
+            print(f"   ✅ {query}")
+        
+        if len(set(loops)) != 1 or loops[0].is_closed():
+            print("❌ Queries ran on different event loops")
+            return False
+        
+        print("✅ Consecutive queries share one event loop")
+        return True
+        
+    except Exception as e:
+        print(f"❌ UI query test failed: {e}")
+        return False
+
+async def test_llm_concurrency():
+    """Test the circuit breaker, scheduler and single-flight without a network."""
+    print("\n🚦 Testing LLM Concurrency Controls...")
+    
+    try:
+        # A private scheduler, breaker and fake backend, so no shared state changes
+        agent = PolicyContextAgent(config.openai_api_key)
+        agent.client = FakeLLMClient(latency=0.0)
+        agent.scheduler = LLMScheduler(max_concurrency=1)
+        agent.circuit_breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.0)
+        agent.response_cache = None
+        messages = agent._prepare_messages("Circuit breaker test")
+        results = []
+        
+        # Half-open trial cancelled while it waits for the only slot
+        agent.circuit_breaker.record_failure()
+        held_slot = agent.scheduler.slot(agent.model)
+        await held_slot.__aenter__()
+        trial = asyncio.create_task(agent._call_openai(messages))
+        await asyncio.sleep(0.05)
+        trial_queued = agent.circuit_breaker.trial_in_flight and not trial.done()
+        trial.cancel()
+        await asyncio.gather(trial, return_exceptions=True)
+        await held_slot.__aexit__(None, None, None)
+        
+        content = await agent._call_openai(messages)
+        results.append(("Cancelled trial does not keep the circuit open",
+                        trial_queued and bool(content) and agent.circuit_breaker.state == "closed"))
+        results.append(("Cancelled waiters hand back their slots",
+                        agent.scheduler.get_stats()[agent.model]["active"] == 0))
+        
+        # Identical concurrent calls share one execution; a cancelled leader's followers run it again
+        flight = SingleFlight()
+        executions = []
+        
+        async def work():
+            executions.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+        
+        shared = await asyncio.gather(flight.run("key", work), flight.run("key", work))
+        results.append(("Identical calls are coalesced", shared == ["result", "result"] and len(executions) == 1))
+        
+        leader = asyncio.create_task(flight.run("key", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.run("key", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results.append(("Followers survive a cancelled leader", await follower == "result"))
+        
+        # Identical concurrent streams receive every chunk of one run
+        productions = []
+        
+        async def produce():
+            productions.append(1)
+            for chunk in ("a", "b", "c"):
+                await asyncio.sleep(0.01)
+                yield chunk
+        
+        async def collect():
+            return [chunk async for chunk in flight.stream("stream", produce)]
+        
+        streamed = await asyncio.gather(collect(), collect())
+        results.append(("Identical streams share one run",
+                        streamed == [["a", "b", "c"]] * 2 and len(productions) == 1))
+        
+        for description, passed in results:
+            print(f"   {'✅' if passed else '❌'} {description}")
+        return all(passed for _, passed in results)
+        
+    except Exception as e:
+        print(f"❌ Concurrency test failed: {e}")
+        return False
+
 async def main():
     """Main test function."""
     print("=" * 80)
@@ -155,6 +280,9 @@ async def main():
         print("\n❌ Agent initialization failed - skipping query test")
     else:
         await test_simple_query(orchestrator)
+        test_consecutive_ui_queries()
+    
+    await test_llm_concurrency()
     
     print("\n" + "=" * 80)
     print("🏁 TESTING COMPLETE")